@@ -1,9 +1,55 @@
-from typing import List, Dict
+from typing import List, Dict, Iterator
+import itertools
+import json
+import os
+import time
 from model_client import call_model
 from collections import deque
 from datetime import timedelta
 from tools import TOOLS_LIST, execute_tool
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    import orjson  # C-extension JSON, ~3-10x faster for transcript writes
+except ImportError:
+    orjson = None
+
+# Shared tokenizer for context-window accounting (loaded lazily - see _get_encoder)
+_ENCODER = None
+_ENCODER_FAILED = False
+
+def _get_encoder():
+    """Get the shared tiktoken encoder, or None if tiktoken is unavailable"""
+    global _ENCODER, _ENCODER_FAILED
+    if _ENCODER is None and not _ENCODER_FAILED and tiktoken is not None:
+        try:
+            _ENCODER = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # No tiktoken data available (e.g. offline) - fall back to the heuristic
+            _ENCODER_FAILED = True
+    return _ENCODER
+
 LOOP_PROMPT = "Continue on your mission by using your tools"
+SUMMARY_PROMPT = """Summarize the following conversation turns in 200 tokens or less.
+Preserve all business facts: product names, quantities, prices, supplier contacts,
+delivery dates, addresses, and account numbers. Merge with the previous summary if one
+is provided, keeping the most recent facts when they conflict.
+
+PREVIOUS SUMMARY:
+{previous_summary}
+
+TURNS TO FOLD IN:
+{turns}
+
+Return only the updated summary text."""
+SUMMARY_BATCH_TOKENS = 2000
+TRANSCRIPT_FLUSH_INTERVAL = 5  # flush the transcript file every N entries
+MAX_WINDOW_ENTRIES = 64  # hard cap on window length, independent of token budget
+_TRANSCRIPT_SEQ = itertools.count()  # disambiguates same-named agents in one process
 SYSTEM_PROMPT = """
 You are an autonomous vending machine operator. You are given a vending machine and you need to sell items to the customers. Your goal is to make money over time.
 
@@ -17,102 +63,213 @@ When emailing suppliers, you MUST include:
 3. Your account number for billing: 1234567890
 """
 class VendingMachineAgent:
-    def __init__(self, name: str = "VendingBot", max_context_tokens: int = 30000, simulation_ref=None):
+    def __init__(self, name: str = "VendingBot", max_context_tokens: int = 30000, simulation_ref=None,
+                 transcript_path: str = None):
         self.name = name
-        self.conversation_history: List[Dict[str, str]] = []
+        # Full history lives on disk as append-only JSONL; only the sliding
+        # window stays resident in memory. History is per-instance (matching
+        # the old in-memory list): the default path is unique per agent and
+        # the file is truncated on construction so no run inherits another's
+        # turns or interleaves writes with a same-named agent.
+        if transcript_path is None:
+            transcript_path = f"{name.lower()}_transcript_{os.getpid()}_{next(_TRANSCRIPT_SEQ)}.jsonl"
+        self._transcript_path = transcript_path
+        self._transcript = open(self._transcript_path, "wb", buffering=65536)
+        self._entries_since_flush = 0
         self.tools = TOOLS_LIST  # Placeholder for future tools
         self.max_context_tokens = max_context_tokens
         self.simulation = simulation_ref  # Reference to parent simulation
-        self.last_6am_time = None  # Track last 6 AM timestamp we processed
+        self._next_6am_trigger = None  # Next 6 AM boundary that should fire a new day
         
         # Sliding window for context management
         self.context_window: deque = deque()
         self.current_context_tokens = 0
-        
-    def get_conversation_history(self) -> List[Dict[str, str]]:
-        """Get the full conversation history"""
-        return self.conversation_history.copy()
-        
+
+        # L2 memory: rolling summary of entries evicted from the window
+        self.summary: str = ""
+        self.summary_tokens: int = 0
+        self._summary_batch: List[str] = []
+        self._summary_batch_tokens: int = 0
+
+    def _append_to_transcript(self, entry: Dict[str, str]):
+        """Append an entry to the JSONL transcript, flushing periodically"""
+        if orjson is not None:
+            line = orjson.dumps(entry) + b"\n"
+        else:
+            line = (json.dumps(entry, separators=(',', ':')) + "\n").encode()
+        self._transcript.write(line)
+        self._entries_since_flush += 1
+        if self._entries_since_flush >= TRANSCRIPT_FLUSH_INTERVAL:
+            self._transcript.flush()
+            self._entries_since_flush = 0
+
+    def get_conversation_history(self) -> Iterator[Dict[str, str]]:
+        """Iterate the full conversation history from the transcript file
+
+        Yields entries lazily so callers never hold the whole history in
+        memory; wrap in list(...) if a materialized copy is needed.
+        """
+        self._transcript.flush()
+        self._entries_since_flush = 0
+        with open(self._transcript_path) as f:
+            for line in f:
+                yield json.loads(line)
+
     def clear_history(self):
         """Clear conversation history and context window"""
-        self.conversation_history = []
+        self._transcript.truncate(0)
+        self._transcript.seek(0)
+        self._entries_since_flush = 0
         self.context_window.clear()
         self.current_context_tokens = 0
+        self.summary = ""
+        self.summary_tokens = 0
+        self._summary_batch = []
+        self._summary_batch_tokens = 0
         
     def _estimate_tokens(self, text: str) -> int:
-        """Rough estimate of tokens (approximately 4 characters per token)"""
+        """Count tokens with tiktoken when available, else estimate at ~4 characters per token"""
+        encoder = _get_encoder()
+        if encoder is not None:
+            return len(encoder.encode_ordinary(text))
         return len(text) // 4
         
     def _add_to_context_window(self, entry: Dict[str, str]):
-        """Add entry to sliding context window, removing old entries if needed"""
-        entry_text = f"{entry['role'].upper()}: {entry['content']}"
-        entry_tokens = self._estimate_tokens(entry_text)
-        
+        """Add entry to sliding context window, removing old entries if needed
+
+        Entries are billed on their raw content - the chat API carries role
+        structurally, so no "ROLE: " prefix tokens are counted or sent.
+        """
+        entry_tokens = self._estimate_tokens(entry['content'])
+
         # Add new entry
         self.context_window.append({
-            'text': entry_text,
-            'tokens': entry_tokens
+            'tokens': entry_tokens,
+            'role': entry['role'],
+            'content': entry['content'],
+            'tool_call_id': entry.get('tool_call_id')
         })
         self.current_context_tokens += entry_tokens
-        
-        # Remove oldest entries until we're under the token limit
-        while self.current_context_tokens > self.max_context_tokens and self.context_window:
-            oldest = self.context_window.popleft()
-            self.current_context_tokens -= oldest['tokens']
-        
-    def _get_context_from_window(self) -> str:
-        """Get conversation history from the sliding window"""
-        if not self.context_window:
-            return ""
-        
-        return "\n".join(entry['text'] for entry in self.context_window)
-        
-    def _build_full_prompt(self, context: str = "", loop_prompt: str = LOOP_PROMPT, system_prompt: str = "") -> str:
-        """Build the complete prompt including system prompt, context, and loop prompt"""
-        prompt_parts = []
-        
-        # Add system prompt if provided
+
+        # Evict on either bound: token budget, or the fixed entry-count cap
+        # (the common case is no eviction - one comparison each)
+        evicted = False
+        while ((self.current_context_tokens > self.max_context_tokens
+                or len(self.context_window) > MAX_WINDOW_ENTRIES)
+               and self.context_window):
+            self._evict_oldest()
+            evicted = True
+
+        if evicted and self._summary_batch_tokens >= SUMMARY_BATCH_TOKENS:
+            self._update_summary()
+
+    def _evict_oldest(self):
+        """Pop the oldest window entry and fold it into the summary batch"""
+        oldest = self.context_window.popleft()
+        self.current_context_tokens -= oldest['tokens']
+        # Role attribution only matters for the summarizer, so the prefixed
+        # form is built here on the cold path
+        self._summary_batch.append(f"{oldest['role'].upper()}: {oldest['content']}")
+        self._summary_batch_tokens += oldest['tokens']
+
+    def _update_summary(self):
+        """Condense the batch of evicted entries into the rolling summary"""
+        prompt = SUMMARY_PROMPT.format(
+            previous_summary=self.summary if self.summary else "(none)",
+            turns="\n".join(self._summary_batch)
+        )
+        try:
+            result = call_model(prompt)
+            new_summary = (result.get("content", "") or "").strip()
+        except Exception:
+            new_summary = ""
+
+        # call_model surfaces request failures as "Error: ..." content -
+        # never adopt that as the summary
+        if new_summary.startswith("Error:"):
+            new_summary = ""
+
+        if new_summary:
+            self.summary = new_summary
+            self.summary_tokens = self._estimate_tokens(new_summary)
+            self._summary_batch = []
+            self._summary_batch_tokens = 0
+        # On failure, keep the batch and retry on the next eviction
+
+    def _remove_orphaned_tool_results(self):
+        """Drop tool-result entries whose originating tool call was evicted
+
+        Eviction pops from the front of the window, so an assistant entry
+        carrying a tool call can disappear while its result entry survives.
+        An unpaired result confuses the model, so scrub them before building
+        the prompt.
+        """
+        call_ids = {
+            entry['tool_call_id'] for entry in self.context_window
+            if entry['role'] == 'assistant' and entry['tool_call_id']
+        }
+
+        orphans = [
+            entry for entry in self.context_window
+            if entry['role'] == 'tool' and entry['tool_call_id'] not in call_ids
+        ]
+        if not orphans:
+            return
+
+        for entry in orphans:
+            self.context_window.remove(entry)
+            self.current_context_tokens -= entry['tokens']
+
+    def _build_messages(self, system_prompt: str = "") -> List[Dict[str, str]]:
+        """Build structured chat messages from the sliding window
+
+        The window already contains the current user turn; entries are sent
+        with their original role/content instead of being flattened into one
+        prefixed text blob.
+        """
+        self._remove_orphaned_tool_results()
+
+        messages = []
         if system_prompt:
-            prompt_parts.append(f"SYSTEM: {system_prompt}")
-            
-        # Add context if provided
-        if context:
-            prompt_parts.append(f"CONTEXT: {context}")
-            
-        # Add conversation history from sliding window
-        history_context = self._get_context_from_window()
-        if history_context:
-            prompt_parts.append("CONVERSATION HISTORY:")
-            prompt_parts.append(history_context)
-                
-        # Add current prompt
-        prompt_parts.append(f"USER: {loop_prompt}")
-        
-        return "\n\n".join(prompt_parts)
-        
+            messages.append({"role": "system", "content": system_prompt})
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of earlier conversation: {self.summary}"})
+
+        for entry in self.context_window:
+            if entry['role'] == 'tool':
+                # Plain-text tool result - sent as a user turn so providers
+                # don't require a structured tool_calls block
+                messages.append({"role": "user", "content": entry['content']})
+            else:
+                messages.append({"role": entry['role'], "content": entry['content']})
+
+        return messages
+
     def is_new_day_at_6am(self):
         """Check if we've passed a 6 AM threshold since last check"""
         if not self.simulation:
             return False
-        
+
         current_time = self.simulation.get_current_time()
-        
-        # Calculate the 6 AM time for the current day
-        current_6am = current_time.replace(hour=6, minute=0, second=0, microsecond=0)
-        
-        # If this is the first check, initialize with current day's 6 AM
-        if self.last_6am_time is None:
-            self.last_6am_time = current_6am
-            # If current time is at or past 6 AM, trigger new day
-            return current_time >= current_6am
-        
-        # Check if we've passed the last recorded 6 AM time
-        if (current_time >= self.last_6am_time + timedelta(days=1)):
-            # Update to the next day's 6 AM for future checks
-            self.last_6am_time = current_6am + timedelta(days=1)
-            return True
-        
-        return False
+
+        # First check: anchor on the current day's 6 AM
+        if self._next_6am_trigger is None:
+            current_6am = current_time.replace(hour=6, minute=0, second=0, microsecond=0)
+            if current_time >= current_6am:
+                self._next_6am_trigger = current_6am + timedelta(days=1)
+                return True
+            self._next_6am_trigger = current_6am
+            return False
+
+        # Steady state: one comparison, no datetime construction
+        if current_time < self._next_6am_trigger:
+            return False
+
+        # Advance past the boundary we just crossed (and any skipped days)
+        self._next_6am_trigger += timedelta(days=1)
+        while self._next_6am_trigger <= current_time:
+            self._next_6am_trigger += timedelta(days=1)
+        return True
 
     def run_agent(self, context: str = "", loop_prompt: str = LOOP_PROMPT, system_prompt: str = SYSTEM_PROMPT) -> str:
         """
@@ -136,44 +293,59 @@ class VendingMachineAgent:
             print(context)
             print("=" * 50)
         
-        # Build the full prompt
-        full_prompt = self._build_full_prompt(context, loop_prompt, system_prompt)
-        
-        # Store the user prompt in history
+        # Store the user prompt in history - the daily context rides along in
+        # the same turn so it stays visible in the window on later turns
         user_entry = {
             "role": "user",
-            "content": loop_prompt,
+            "content": f"{context}\n\n{loop_prompt}" if context else loop_prompt,
             "timestamp": self._get_timestamp()
         }
-        self.conversation_history.append(user_entry)
-        user_entry["context"] = context
+        self._append_to_transcript(user_entry)
         self._add_to_context_window(user_entry)
+
+        # Get response from model with tools, sending the window as
+        # structured messages instead of one flattened prompt string
+        messages = self._build_messages(system_prompt)
+        model_result = call_model(messages=messages, tools=TOOLS_LIST)
         
-        # Get response from model with tools
-        model_result = call_model(full_prompt, tools=TOOLS_LIST)
-        
-        response_text = model_result.get("content", "")
+        response_text = model_result.get("content") or ""
         tool_calls = model_result.get("tool_calls", None)
         
+        # Store the agent's response in history
+        assistant_entry = {
+            "role": "assistant",
+            "content": response_text,
+            "timestamp": self._get_timestamp(),
+        }
+
         # Handle tool call if present (single tool only)
+        tool_entry = None
         if tool_calls:
             tool_call = tool_calls[0]  # Only one due to model_client restriction
-            
+
+            # Pair the call and its result so orphan cleanup can match them
+            tool_call_id = getattr(tool_call, 'id', None) or f"call_{len(self.context_window)}"
+            assistant_entry["tool_call_id"] = tool_call_id
+
             # Execute the tool using centralized function
             tool_result = execute_tool(tool_call, self.simulation)
-            
+
+            tool_entry = {
+                "role": "tool",
+                "content": tool_result["message"].strip(),
+                "tool_call_id": tool_call_id,
+                "timestamp": self._get_timestamp(),
+            }
+
             # Append tool result message to response
             response_text += tool_result["message"]
-        
-        # Store the agent's response in history
-        assistant_entry = {
-            "role": "assistant", 
-            "content": response_text,
-            "timestamp": self._get_timestamp(),
-        }
-        self.conversation_history.append(assistant_entry)
+
+        self._append_to_transcript(assistant_entry)
         self._add_to_context_window(assistant_entry)
-        
+        if tool_entry:
+            self._append_to_transcript(tool_entry)
+            self._add_to_context_window(tool_entry)
+
         return response_text
         
     def _get_timestamp(self) -> str:
@@ -214,7 +386,6 @@ def test_agent():
         try:
             # Get agent response
             print("⏳ Sending prompt to agent...")
-            import time
             start_time = time.time()
             
             response = agent.run_agent(
@@ -235,13 +406,14 @@ def test_agent():
     
     print("\n" + "=" * 50)
     print("📈 FINAL STATISTICS")
-    print(f"Total conversation history: {len(agent.conversation_history)} entries")
+    conversation_history = list(agent.get_conversation_history())
+    print(f"Total conversation history: {len(conversation_history)} entries")
     print(f"Context window size: {len(agent.context_window)} entries")
     print(f"Current context tokens: {agent.current_context_tokens}")
     
     # Show last few exchanges
     print("\n📝 LAST 3 EXCHANGES:")
-    for entry in agent.conversation_history[-6:]:  # Last 3 user-assistant pairs
+    for entry in conversation_history[-6:]:  # Last 3 user-assistant pairs
         role_emoji = "👤" if entry["role"] == "user" else "🤖"
         print(f"{role_emoji} {entry['role'].upper()}: {entry['content'][:100]}...")
     
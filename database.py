@@ -1,10 +1,31 @@
 import sqlite3
 from datetime import datetime
 
+LOG_BATCH_SIZE = 128
+
+# Hot-path SQL kept as constants so the sqlite3 statement cache can reuse
+# the compiled statements across calls
+_INSERT_SQL = '''
+    INSERT INTO simulation_state (timestamp, simulation_id, balance)
+    VALUES (?, ?, ?)
+'''
+_SELECT_SQL = '''
+    SELECT timestamp, balance FROM simulation_state
+    WHERE simulation_id = ?
+    ORDER BY timestamp
+'''
+
 class SimulationDatabase:
     def __init__(self, db_path='vending_simulation.db'):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.conn = sqlite3.connect(db_path, cached_statements=256)
+        # WAL + NORMAL sync cut the per-commit fsync cost for logging
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        # Buffered state rows, flushed in one transaction per batch
+        self._pending = []
+        # Reusable cursor for the hot insert/select paths
+        self._cursor = self.conn.cursor()
         self.create_tables()
     
     def create_tables(self):
@@ -20,30 +41,56 @@ class SimulationDatabase:
                 PRIMARY KEY (timestamp, simulation_id)
             )
         ''')
-        
-        self.conn.commit()
-    
-    def log_state(self, simulation_id, timestamp, balance):
-        """Log current simulation state"""
-        cursor = self.conn.cursor()
+
+        # Composite index so per-simulation history reads are an index
+        # range scan instead of a full table scan + sort
         cursor.execute('''
-            INSERT INTO simulation_state (timestamp, simulation_id, balance)
-            VALUES (?, ?, ?)
-        ''', (timestamp.isoformat(), simulation_id, balance))
+            CREATE INDEX IF NOT EXISTS idx_sim_ts
+            ON simulation_state(simulation_id, timestamp)
+        ''')
+
         self.conn.commit()
     
-    def get_simulation_history(self, simulation_id):
-        """Get all states for a simulation"""
+    def log_state(self, simulation_id, timestamp_iso, balance):
+        """Log current simulation state (buffered - flushed every LOG_BATCH_SIZE rows)
+
+        timestamp_iso: preformatted ISO timestamp string (callers format once per tick)
+        """
+        self._pending.append((timestamp_iso, simulation_id, balance))
+        if len(self._pending) >= LOG_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered state rows in a single transaction"""
+        if not self._pending:
+            return
+        self._cursor.executemany(_INSERT_SQL, self._pending)
+        self.conn.commit()
+        self._pending.clear()
+
+    def get_simulation_history(self, simulation_id, chunk_size=512):
+        """Get all states for a simulation
+
+        Returns a generator yielding (timestamp, balance) rows in chunks of
+        chunk_size, so memory stays constant regardless of simulation length.
+        Callers that need a list can wrap it in list(...).
+        """
+        self.flush()
         cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT timestamp, balance FROM simulation_state
-            WHERE simulation_id = ?
-            ORDER BY timestamp
-        ''', (simulation_id,))
-        return cursor.fetchall()
+        cursor.execute(_SELECT_SQL, (simulation_id,))
+
+        def _iter_rows():
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+
+        return _iter_rows()
     
     def close(self):
-        """Close database connection"""
+        """Flush buffered rows and close database connection"""
+        self.flush()
         self.conn.close()
 
 def clear_database():
@@ -1,44 +1,130 @@
+import hashlib
 import json
-import requests
+import re
 import math
+import numpy as np
+import threading
 from typing import Dict, List, Tuple
 from model_client import call_model
 from weather import get_weather_sales_multiplier
-from functools import cache
+from functools import lru_cache
 from vending_machine import VendingMachine, Item
 
+try:
+    from numba import njit  # optional - kernels run as plain Python without it
+except ImportError:
+    njit = None
+
+# Cache of analysis results keyed by (item_name, price, size), persisted to a
+# JSON sidecar so identical items are never re-queried across runs
+ANALYSIS_CACHE_PATH = "item_analysis_cache.json"
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()  # analyses run on a thread pool
+
+def _get_analysis_cache() -> Dict:
+    """Load the persistent analysis cache on first use"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        try:
+            with open(ANALYSIS_CACHE_PATH) as f:
+                _analysis_cache = json.load(f)
+        except (OSError, ValueError):
+            _analysis_cache = {}
+    return _analysis_cache
+
+def _analysis_cache_key(item_name: str, item_price: float, item_size: str, context: str = "") -> str:
+    """Exact-match cache key for an item analysis
+
+    The context string feeds the prompt, so it is folded in (hashed, to keep
+    keys short) - a changed context must not serve stale results.
+    """
+    key = f"{item_name}|{item_price:.2f}|{item_size}"
+    if context:
+        key += f"|{hashlib.sha256(context.encode()).hexdigest()[:16]}"
+    return key
+
+def _save_analysis_cache():
+    """Write the analysis cache back to its JSON sidecar"""
+    try:
+        with open(ANALYSIS_CACHE_PATH, "w", buffering=65536) as f:
+            json.dump(_analysis_cache, f)
+    except OSError:
+        pass  # Cache persistence is best-effort
+
+@lru_cache(maxsize=4096)
 def analyze_single_item(item_name: str, item_price: float, item_size: str, quantity: int, context: str = "") -> Tuple[float, float, int]:
     """
     Analyze a single item and return (price_elasticity, reference_price, base_sales)
+
+    Repeat calls with identical arguments are memoized in-process (mirroring
+    the @cache'd multipliers below); underneath that, results are cached by
+    (item_name, price, size, context) in a JSON sidecar shared across runs.
     """
+    cache_key = _analysis_cache_key(item_name, item_price, item_size, context)
+    with _analysis_cache_lock:
+        cached = _get_analysis_cache().get(cache_key)
+    if cached is not None:
+        return cached[0], cached[1], cached[2]
+
     prompt = create_single_item_prompt(item_name, item_price, item_size, quantity, context)
     response = call_model(prompt)
-    return parse_single_item_response(response, item_price)
+    result = parse_single_item_response(response, item_price)
 
-def generate_customer_behavior(vending_machine_slots: Dict, context: str = "") -> Dict:
+    with _analysis_cache_lock:
+        _get_analysis_cache()[cache_key] = list(result)
+        _save_analysis_cache()
+    return result
+
+def generate_customer_behavior(unique_items: Dict[str, Tuple[Item, int]], context: str = "") -> Dict:
     """
-    Generate customer behavior metrics for each item in the vending machine
+    Generate customer behavior metrics for each unique item
+
+    Args:
+        unique_items: item_name -> (Item, quantity), already deduped by the
+            caller's slot pass
+
     Returns: Dict with item_name -> {price_elasticity, reference_price, base_sales}
+
+    Cached items are served from the analysis cache; all remaining items are
+    analyzed in a single batched model call instead of one round trip each.
     """
+    if not unique_items:
+        return {}
+
     behavior_data = {}
-    
-    for _, slot in vending_machine_slots.items():
-        item_data = slot['item']
-        if item_data is None:
-            continue
-        item_name = item_data.name  
-        if item_name not in behavior_data:  # Avoid duplicates if same item in multiple slots
-            price_elasticity, reference_price, base_sales = analyze_single_item(
-                item_name, item_data.price, item_data.size, slot['quantity'], context
-            )
-            behavior_data[item_name] = {
-                "price_elasticity": price_elasticity,
-                "reference_price": reference_price,
-                "base_sales": base_sales
-            }
-    
+    misses = []
+    for item_name, (item_data, quantity) in unique_items.items():
+        cache_key = _analysis_cache_key(item_name, item_data.price, item_data.size, context)
+        with _analysis_cache_lock:
+            cached = _get_analysis_cache().get(cache_key)
+        if cached is not None:
+            behavior_data[item_name] = _metrics_entry(cached[0], cached[1], cached[2])
+        else:
+            misses.append((item_name, item_data.price, item_data.size, quantity))
+
+    if misses:
+        prompt = create_batch_items_prompt(misses, context)
+        response = call_model(prompt)
+        results = parse_batch_response(response, misses)
+
+        with _analysis_cache_lock:
+            cache = _get_analysis_cache()
+            for (item_name, item_price, item_size, _), result in zip(misses, results):
+                cache[_analysis_cache_key(item_name, item_price, item_size, context)] = list(result)
+                behavior_data[item_name] = _metrics_entry(result[0], result[1], result[2])
+            _save_analysis_cache()
+
     return behavior_data
 
+def _metrics_entry(price_elasticity: float, reference_price: float, base_sales: int) -> Dict:
+    """Build a behavior_metrics entry, precomputing the folded base/ref ratio"""
+    return {
+        "price_elasticity": price_elasticity,
+        "reference_price": reference_price,
+        "base_sales": base_sales,
+        "base_over_ref": base_sales / reference_price if reference_price else 0.0
+    }
+
 def create_single_item_prompt(item_name: str, item_price: float, item_size: str, quantity: int, context: str) -> str:
     """Create prompt for analyzing a single item"""
     
@@ -74,60 +160,157 @@ Response:"""
     
     return prompt
 
-def parse_single_item_response(response: str, fallback_price: float) -> Tuple[float, float, int]:
-    """Parse Claude's response for a single item"""
-    try:
-        parts = response.strip().split(',')
-        price_elasticity = float(parts[0])
-        reference_price = float(parts[1])
-        base_sales = int(parts[2])
-        return price_elasticity, reference_price, base_sales
-    except (ValueError, IndexError):
-        # Fallback to defaults if parsing fails
-        return -1.0, fallback_price, 10
+def create_batch_items_prompt(items: List[Tuple[str, float, str, int]], context: str) -> str:
+    """Create one prompt analyzing several items at once
+
+    Args:
+        items: list of (item_name, item_price, item_size, quantity) tuples
+    """
+    item_lines = []
+    for i, (item_name, item_price, item_size, quantity) in enumerate(items, 1):
+        item_lines.append(
+            f"{i}. {item_name} - Price: ${item_price}, Size: {item_size}, In stock: {quantity} units"
+        )
+
+    prompt = f"""You are an economics expert analyzing customer behavior for vending machine items.
+
+CONTEXT: {context if context else "Standard office building vending machine"}
+
+ITEMS TO ANALYZE:
+{chr(10).join(item_lines)}
+
+For EACH item calculate these three values:
+
+1. PRICE_ELASTICITY: How sensitive customers are to price changes (-2.0 to -0.1, more negative = more sensitive)
+2. REFERENCE_PRICE: What customers expect to pay for this item (in dollars)
+3. BASE_SALES: Daily sales volume at reference price (units per day; cannot exceed the item's stock)
+
+Return ONLY one line per item, in the same order, each formatted as:
+price_elasticity,reference_price,base_sales
+
+Example for two items:
+-1.2,2.50,15
+-0.8,1.75,10
+
+Response:"""
+
+    return prompt
+
+def parse_batch_response(response, items: List[Tuple[str, float, str, int]]) -> List[Tuple[float, float, int]]:
+    """Parse the model's one-line-per-item batch response
+
+    Falls back to per-item defaults for any line that is missing or malformed.
+    """
+    if isinstance(response, dict):  # call_model returns {content, tool_calls}
+        response = response.get("content") or ""
+
+    lines = [line for line in response.strip().splitlines() if line.strip()]
+
+    results = []
+    for i, (_, item_price, _, _) in enumerate(items):
+        match = _PARSE_RE.search(lines[i]) if i < len(lines) else None
+        if match:
+            results.append((float(match[1]), float(match[2]), int(match[3])))
+        else:
+            results.append((-1.0, item_price, 10))
+    return results
+
+# Matches "price_elasticity,reference_price,base_sales" e.g. "-1.2,2.50,15"
+_PARSE_RE = re.compile(r'\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+)')
+
+def parse_single_item_response(response, fallback_price: float) -> Tuple[float, float, int]:
+    """Parse the model's response for a single item"""
+    if isinstance(response, dict):  # call_model returns {content, tool_calls}
+        response = response.get("content") or ""
+
+    match = _PARSE_RE.match(response)
+    if match:
+        return float(match[1]), float(match[2]), int(match[3])
+
+    # Fallback to defaults if parsing fails
+    return -1.0, fallback_price, 10
+
+def _item_sales_kernel(current_price: float, reference_price: float,
+                       price_elasticity: float, base_over_ref: float) -> int:
+    """Pure numeric core of the elasticity formula (JIT-compiled when numba is present)
+
+    base * (1 + elasticity*(price-ref)/ref) folded to
+    (base/ref) * (ref + elasticity*(price-ref)) with base/ref precomputed,
+    saving the division per call.
+    """
+    expected_sales = base_over_ref * (reference_price + price_elasticity * (current_price - reference_price))
+
+    # Return as integer (can't sell fractional items); expected is >= 0 after
+    # the clamp, so add-0.5-and-truncate replaces the round() call
+    return max(0, int(expected_sales + 0.5))
+
+if njit is not None:
+    _item_sales_kernel = njit(cache=True)(_item_sales_kernel)
 
 def calculate_item_sales(item_name: str, current_price: float, behavior_metrics: Dict) -> int:
     """Calculate expected daily sales based on current price and behavior metrics"""
     if item_name not in behavior_metrics:
         return 0
-    
+
     metrics = behavior_metrics[item_name]
-    price_elasticity = metrics['price_elasticity']
-    reference_price = metrics['reference_price']
-    base_sales = metrics['base_sales']
-    
-    # Calculate percentage difference from reference price
-    percentage_diff = (current_price - reference_price) / reference_price
-    
-    # Create sales impact factor using price elasticity
-    # Impact = 1 + (elasticity * percentage_difference)
-    sales_impact_factor = 1 + (price_elasticity * percentage_diff)
-    
-    # Apply impact factor to base sales
-    expected_sales = base_sales * sales_impact_factor
-    
-    # Return as integer (can't sell fractional items)
-    return max(0, int(round(expected_sales)))
+    base_over_ref = metrics.get('base_over_ref')
+    if base_over_ref is None:
+        base_over_ref = metrics['base_sales'] / metrics['reference_price']
+    return _item_sales_kernel(
+        current_price,
+        metrics['reference_price'],
+        metrics['price_elasticity'],
+        base_over_ref
+    )
 
-@cache 
-def calculate_choice_multiplier(num_products: int) -> float:
+def calculate_item_sales_bulk(current_prices: Dict[str, float], behavior_metrics: Dict) -> Dict[str, int]:
     """
-    Calculate choice multiplier using sigmoid function
-    Optimal variety is around 10 products, with diminishing returns beyond that
-    Floor is 0.5, punishment for too little or too much variety
+    Vectorized version of calculate_item_sales for many items at once
+
+    Args:
+        current_prices: item_name -> current selling price
+        behavior_metrics: item_name -> {price_elasticity, reference_price, base_sales}
+
+    Returns:
+        item_name -> expected daily sales (items missing from behavior_metrics sell 0)
     """
+    names = [name for name in current_prices if name in behavior_metrics]
+    sales = {name: 0 for name in current_prices}
+    if not names:
+        return sales
+
+    prices = np.array([current_prices[name] for name in names])
+    elasticity = np.array([behavior_metrics[name]['price_elasticity'] for name in names])
+    reference = np.array([behavior_metrics[name]['reference_price'] for name in names])
+    base = np.array([behavior_metrics[name]['base_sales'] for name in names])
+
+    # Exactly the scalar kernel's folded form - (base/ref)*(ref + e*(p-ref))
+    # with half-up rounding - so bulk and scalar agree bit-for-bit; a zero
+    # reference price sells 0 (matching _metrics_entry's guard) instead of
+    # poisoning the array with NaN
+    valid_ref = reference != 0
+    safe_reference = np.where(valid_ref, reference, 1.0)
+    base_over_ref = np.where(valid_ref, base / safe_reference, 0.0)
+    expected = base_over_ref * (reference + elasticity * (prices - reference))
+    expected = np.maximum(0, np.floor(expected + 0.5)).astype(np.int32)
+
+    sales.update(zip(names, (int(s) for s in expected)))
+    return sales
+
+def _choice_multiplier_kernel(num_products: int) -> float:
+    """Pure numeric core of the choice multiplier (JIT-compiled when numba is present)"""
     if num_products == 0:
         return 0.5
-    
+
     # Sigmoid function: f(x) = 1 / (1 + e^(-k*(x - x0)))
     # Where x0 is the inflection point (optimal variety = 10)
     # k controls the steepness of the curve
     x0 = 10.0  # Optimal number of products
     k = 0.5    # Steepness factor
-    
+
     # Apply sigmoid centered at x0
     sigmoid = 1 / (1 + math.exp(-k * (num_products - x0)))
-    
+
     # Scale to have max around 1.0 at optimal point
     # And apply punishment for extremes
     if num_products <= x0:
@@ -137,53 +320,56 @@ def calculate_choice_multiplier(num_products: int) -> float:
         # For high variety, diminishing returns from 1.0 downward
         excess_penalty = math.exp(-0.1 * (num_products - x0))
         multiplier = sigmoid * excess_penalty
-    
+
     # Ensure floor of 0.5
     return max(0.5, multiplier)
 
-@cache 
+if njit is not None:
+    _choice_multiplier_kernel = njit(cache=True)(_choice_multiplier_kernel)
+
+# Realistic product counts are tiny - precompute the curve once at import so
+# the hot path is a tuple index with no exp calls
+_CHOICE_MULT = tuple(_choice_multiplier_kernel(n) for n in range(64))
+
+def calculate_choice_multiplier(num_products: int) -> float:
+    """
+    Calculate choice multiplier using sigmoid function
+    Optimal variety is around 10 products, with diminishing returns beyond that
+    Floor is 0.5, punishment for too little or too much variety
+    """
+    if 0 <= num_products < 64:
+        return _CHOICE_MULT[num_products]
+    return _choice_multiplier_kernel(num_products)
+
+# Month multipliers, index 1-12 (index 0 pads for 1-based months):
+# post-holiday slump through peak summer and back down
+_MONTH_MULT = (1.00, 0.80, 0.85, 0.95, 1.05, 1.10, 1.15, 1.20, 1.20, 1.10, 1.00, 0.90, 0.95)
+
+# Day-of-week multipliers, 0=Monday through 6=Sunday:
+# slow Monday start, TGIF energy, peak weekend
+_DOW_MULT = (0.85, 0.95, 1.00, 1.05, 1.15, 1.25, 1.20)
+
 def get_month_multiplier(month: int) -> float:
     """
     Get sales multiplier based on month (1-12)
     Higher sales in summer months, lower in winter
     """
-    multipliers = {
-        1: 0.80,   # January - post-holiday slump
-        2: 0.85,   # February - still winter
-        3: 0.95,   # March - spring pickup
-        4: 1.05,   # April - nice weather begins
-        5: 1.10,   # May - pleasant weather
-        6: 1.15,   # June - summer begins
-        7: 1.20,   # July - peak summer
-        8: 1.20,   # August - peak summer
-        9: 1.10,   # September - back to school/work
-        10: 1.00,  # October - baseline fall
-        11: 0.90,  # November - cooling down
-        12: 0.95   # December - holiday season but cold
-    }
-    return multipliers.get(month, 1.00)
+    return _MONTH_MULT[month] if 1 <= month <= 12 else 1.00
 
-@cache 
 def get_day_of_week_multiplier(day_of_week: int) -> float:
     """
     Get sales multiplier based on day of week (0=Monday, 6=Sunday)
     Higher sales on weekends, lower on Mondays
     """
-    multipliers = {
-        0: 0.85,   # Monday - slow start
-        1: 0.95,   # Tuesday - picking up
-        2: 1.00,   # Wednesday - midweek baseline
-        3: 1.05,   # Thursday - almost weekend
-        4: 1.15,   # Friday - TGIF energy
-        5: 1.25,   # Saturday - peak weekend
-        6: 1.20    # Sunday - weekend but preparing for week
-    }
-    return multipliers.get(day_of_week, 1.00)
+    return _DOW_MULT[day_of_week] if 0 <= day_of_week <= 6 else 1.00
 
 def calculate_item_final_sales(item_data: Item, behavior_metrics: Dict, unique_products: int, weather: str = "cloudy", month: int = 6, day_of_week: int = 2) -> int:
     """
     Calculate final sales with choice multiplier, weather, month, and day-of-week effects applied
-    
+
+    Slow path for one-off callers - calculate_total_sales_and_report hoists
+    the multiplier product out of its slot loop instead of calling this.
+
     Args:
         item_name: Name of the item
         current_price: Current selling price
@@ -209,31 +395,68 @@ def calculate_item_final_sales(item_data: Item, behavior_metrics: Dict, unique_p
     # Apply all multipliers
     final_sales = item_sales *  choice_multiplier * weather_multiplier * month_multiplier * day_multiplier
     
-    return max(0, int(round(final_sales)))
+    # Half-up like the kernel and the batch paths (final_sales is >= 0 here)
+    return max(0, int(final_sales + 0.5))
 
 def calculate_total_sales_and_report(vending_machine: VendingMachine, weather: str = "cloudy", month: int = 6, day_of_week: int = 2) -> Tuple[int, str]:
     """
     Calculate total sales for all items in the vending machine
     """
     vending_machine_slots = vending_machine.get_slots()
-    unique_products = set()
-
-    behavior_metrics = generate_customer_behavior(vending_machine_slots)
-    report = "Total Sales Report:\n"
-    for _, slot in vending_machine_slots.items():
-        if slot['item'] is not None:
-            unique_products.add(slot['item'].name)
-    unique_products = len(unique_products)
-    total_sales = 0
+
+    # One pass over the slots collects both the occupied list (for the
+    # vectorized sales pass) and the deduped items to analyze
+    occupied = []
+    items_to_analyze = {}
     for slot_id, slot in vending_machine_slots.items():
-        if slot['item'] is None:
-            continue
         item_data = slot['item']
-        final_sales = calculate_item_final_sales(item_data, behavior_metrics, unique_products, weather, month, day_of_week)
-        vending_machine.sell_item(slot_id, final_sales)
-        total_sales += final_sales * item_data.price
-        report += f"{item_data.name}: ${final_sales}\n"
-    
-    report += f"\nTotal Sales: ${total_sales}"
+        if item_data is None:
+            continue
+        occupied.append((slot_id, item_data))
+        items_to_analyze.setdefault(item_data.name, (item_data, slot['quantity']))
+
+    behavior_metrics = generate_customer_behavior(items_to_analyze)
+    report_lines = ["Total Sales Report:"]
+    unique_products = len(items_to_analyze)
+
+    # All four multipliers are constant for the day - compute their product
+    # once instead of re-fetching per slot
+    env_mult = (calculate_choice_multiplier(unique_products)
+                * get_weather_sales_multiplier(weather)
+                * get_month_multiplier(month)
+                * get_day_of_week_multiplier(day_of_week))
+
+    total_sales = 0
+    if occupied:
+        # Elasticity formula for every slot in one fused NumPy expression
+        # (items without metrics sell 0 - base 0, reference 1 avoids /0)
+        prices = np.array([item_data.price for _, item_data in occupied])
+        elasticity = np.array([behavior_metrics.get(item_data.name, {}).get('price_elasticity', 0.0)
+                               for _, item_data in occupied])
+        reference = np.array([behavior_metrics.get(item_data.name, {}).get('reference_price', 1.0)
+                              for _, item_data in occupied])
+        base = np.array([behavior_metrics.get(item_data.name, {}).get('base_sales', 0)
+                         for _, item_data in occupied])
+
+        # Exactly the scalar kernel's folded form with half-up rounding at
+        # both steps; a zero reference price (bad parse) sells 0 instead of
+        # propagating NaN
+        valid_ref = reference != 0
+        safe_reference = np.where(valid_ref, reference, 1.0)
+        base_over_ref = np.where(valid_ref, base / safe_reference, 0.0)
+        expected = base_over_ref * (reference + elasticity * (prices - reference))
+        item_sales = np.maximum(0, np.floor(expected + 0.5))
+        final_sales_arr = np.maximum(0, np.floor(item_sales * env_mult + 0.5)).astype(np.int64)
+
+        slot_updates = {}
+        for (slot_id, item_data), final_sales in zip(occupied, final_sales_arr):
+            final_sales = int(final_sales)
+            slot_updates[slot_id] = final_sales
+            total_sales += final_sales * item_data.price
+            report_lines.append(f"{item_data.name}: ${final_sales}")
+        vending_machine.sell_items(slot_updates)
+
+    report_lines.append("")
+    report_lines.append(f"Total Sales: ${total_sales}")
 
-    return total_sales, report
\ No newline at end of file
+    return total_sales, "\n".join(report_lines)
\ No newline at end of file
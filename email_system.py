@@ -1,19 +1,43 @@
+import asyncio
+import io
+import sys
+from collections import defaultdict
 from datetime import datetime, timezone
 from typing import List, Dict, Optional
 import json
+from model_client import call_model
+from search import search_perplexity
+from tools import SUPPLIER_TOOLS, execute_supplier_tool
+
+# Bound on concurrent supplier-response model calls
+SUPPLIER_RESPONSE_CONCURRENCY = 5
 
 
 class Email:
+    __slots__ = ("id", "timestamp", "sender", "recipient", "subject", "body", "email_type", "read",
+                 "_formatted_ts", "canonical_subject")
+
     def __init__(self, sender: str, recipient: str, subject: str, body: str, email_type: str = "general"):
         self.id = None  # Will be set by EmailSystem
         self.timestamp = datetime.now(timezone.utc)
-        self.sender = sender
-        self.recipient = recipient
+        self._formatted_ts = None  # Display timestamp, formatted once on first render
+        # Addresses and types repeat constantly across a simulation - intern
+        # them so equality and dict lookups are pointer comparisons
+        self.sender = sys.intern(sender)
+        self.recipient = sys.intern(recipient)
         self.subject = subject
+        # Normalized thread key: lowercased, "Re: " stripped - computed once
+        self.canonical_subject = (subject[4:] if subject[:4].lower() == "re: " else subject).strip().lower()
         self.body = body
-        self.email_type = email_type
+        self.email_type = sys.intern(email_type)
         self.read = False
     
+    def formatted_timestamp(self) -> str:
+        """Display timestamp, cached after the first strftime"""
+        if self._formatted_ts is None:
+            self._formatted_ts = self.timestamp.strftime('%Y-%m-%d %H:%M UTC')
+        return self._formatted_ts
+
     def __repr__(self):
         return f"Email({self.id}, {self.sender} -> {self.recipient}, '{self.subject}')"
 
@@ -25,6 +49,13 @@ class EmailSystem:
         self.outbox = []  # Sent emails
         self.email_counter = 0
         self.recipient_profiles = {}  # Dict with email -> profile info
+        self._domain_profiles = {}  # Dict with domain -> profile (many addresses share one org)
+        self._response_context_cache = {}  # (domain, subject) -> search context
+        # Indexes so id/type/unread access doesn't scan the mailboxes
+        self._by_id: Dict[str, Email] = {}
+        self._by_type: Dict[str, List[Email]] = defaultdict(list)
+        self._unread: Dict[str, Email] = {}  # insertion-ordered unread inbox emails
+        self._pending_responses: Dict[str, Email] = {}  # outbox emails awaiting a reply, in send order
     
     def send_email(self, recipient: str, subject: str, body: str, email_type: str = "order") -> str:
         """Send an email from the agent"""
@@ -38,6 +69,9 @@ class EmailSystem:
         )
         email.id = f"sent_{self.email_counter:03d}"
         self.outbox.append(email)
+        self._by_id[email.id] = email
+        self._by_type[email_type].append(email)
+        self._pending_responses[email.id] = email
         return email.id
     
     def receive_email(self, sender: str, subject: str, body: str, email_type: str = "supplier_response") -> str:
@@ -52,46 +86,61 @@ class EmailSystem:
         )
         email.id = f"recv_{self.email_counter:03d}"
         self.inbox.append(email)
+        self._by_id[email.id] = email
+        self._by_type[email_type].append(email)
+        self._unread[email.id] = email
+        if subject[:4].lower() == "re: ":
+            # The thread got its answer - drop matching outbox emails from
+            # the pending-response queue
+            for sent_id, sent_email in list(self._pending_responses.items()):
+                if sent_email.canonical_subject == email.canonical_subject:
+                    del self._pending_responses[sent_id]
         return email.id
     
     def get_unread_emails(self) -> List[Email]:
         """Get all unread emails from inbox"""
-        return [email for email in self.inbox if not email.read]
+        return list(self._unread.values())
     
-    def get_all_emails(self, mailbox: str = "inbox") -> List[Email]:
-        """Get all emails from specified mailbox"""
+    def get_all_emails(self, mailbox: str = "inbox", copy: bool = True) -> List[Email]:
+        """Get all emails from specified mailbox
+
+        Pass copy=False for read-only iteration to skip the O(N) list copy;
+        the default stays safe for callers that might mutate the result.
+        """
         if mailbox == "inbox":
-            return self.inbox.copy()
+            return self.inbox.copy() if copy else self.inbox
         elif mailbox == "outbox":
-            return self.outbox.copy()
+            return self.outbox.copy() if copy else self.outbox
         else:
             return self.inbox + self.outbox
     
     def mark_email_read(self, email_id: str) -> bool:
         """Mark a specific email as read"""
-        for email in self.inbox:
-            if email.id == email_id:
-                email.read = True
-                return True
-        return False
-    
+        email = self._by_id.get(email_id)
+        if email is None or email.recipient != self.agent_email:
+            return False
+        email.read = True
+        self._unread.pop(email_id, None)
+        return True
+
     def mark_all_read(self) -> int:
         """Mark all inbox emails as read, return count marked"""
-        count = 0
-        for email in self.inbox:
-            if not email.read:
-                email.read = True
-                count += 1
+        count = len(self._unread)
+        for email in self._unread.values():
+            email.read = True
+        self._unread.clear()
         return count
-    
+
     def get_emails_by_type(self, email_type: str, mailbox: str = "inbox") -> List[Email]:
         """Get emails of a specific type"""
-        emails = self.inbox if mailbox == "inbox" else self.outbox
-        return [email for email in emails if email.email_type == email_type]
+        # Inbox emails are addressed to the agent; sent ones are from it
+        if mailbox == "inbox":
+            return [email for email in self._by_type[email_type] if email.recipient == self.agent_email]
+        return [email for email in self._by_type[email_type] if email.sender == self.agent_email]
     
     def get_email_count(self) -> Dict[str, int]:
         """Get email counts by status"""
-        unread = len(self.get_unread_emails())
+        unread = len(self._unread)
         total_inbox = len(self.inbox)
         total_sent = len(self.outbox)
         return {
@@ -105,36 +154,52 @@ class EmailSystem:
         unread = self.get_unread_emails()
         if not unread:
             return "No unread emails."
-        
-        formatted_emails = []
+
+        # Stream into one buffer - no per-email intermediate strings
+        buf = io.StringIO()
+        first = True
         for email in unread:
-            email_text = f"""From: {email.sender}
-Subject: {email.subject}
-Date: {email.timestamp.strftime('%Y-%m-%d %H:%M UTC')}
+            if not first:
+                buf.write("\n----\n")
+            first = False
+            buf.write("From: ")
+            buf.write(email.sender)
+            buf.write("\nSubject: ")
+            buf.write(email.subject)
+            buf.write("\nDate: ")
+            buf.write(email.formatted_timestamp())
+            buf.write("\n\n")
+            buf.write(email.body)
 
-{email.body}"""
-            formatted_emails.append(email_text)
-        
-        # Join with '----' spacers and mark all as read
-        result = "\n----\n".join(formatted_emails)
+        # Mark all as read now that they've been surfaced
         self.mark_all_read()
-        return result
+        return buf.getvalue()
     
     def create_recipient_profile(self, email_address: str) -> str:
-        """Create a new recipient profile using Perplexity search"""
-        from search import search_perplexity
-        
+        """Create a new recipient profile using Perplexity search
+
+        Profiles are cached per domain as well - addresses at the same
+        organization share one search.
+        """
+
         # Extract organization name from email for better search
         domain = email_address.split('@')[-1]
+
+        cached = self._domain_profiles.get(domain)
+        if cached is not None:
+            self.recipient_profiles[email_address] = cached
+            return cached
+
         org_name = domain.split('.')[0].replace('-', ' ').replace('_', ' ')
-        
+
         search_query = f"information about {org_name} company organization business contact {email_address}"
-        
+
         profile_content, error = search_perplexity(search_query)
-        
+
         if error is None:
             # Store the profile
             self.recipient_profiles[email_address] = profile_content
+            self._domain_profiles[domain] = profile_content
             return profile_content
         else:
             # Fallback profile if search fails
@@ -150,8 +215,13 @@ Date: {email.timestamp.strftime('%Y-%m-%d %H:%M UTC')}
     
     def get_response_context(self, recipient_email: str, email_subject: str, email_body: str) -> str:
         """Get enhanced context for response generation by searching for recipient + products info"""
-        from search import search_perplexity
-        
+
+        # Identical inquiries to the same organization share one search
+        context_key = (recipient_email.split('@')[-1], email_subject, email_body)
+        cached = self._response_context_cache.get(context_key)
+        if cached is not None:
+            return cached
+
         # Extract product information from the email
         # Look for product names, quantities, and specific requests
         context_query = f"""
@@ -164,8 +234,9 @@ Date: {email.timestamp.strftime('%Y-%m-%d %H:%M UTC')}
         """
         
         response_context, error = search_perplexity(context_query)
-        
+
         if error is None:
+            self._response_context_cache[context_key] = response_context
             return response_context
         else:
             # Fallback to basic recipient profile if enhanced search fails
@@ -174,28 +245,74 @@ Date: {email.timestamp.strftime('%Y-%m-%d %H:%M UTC')}
     # Supplier tool execution moved to tools.py
 
     def generate_supplier_responses(self, simulation_ref=None):
-        """Generate AI responses to recent outgoing emails using recipient profiles"""
-        from model_client import call_model
-        from tools import SUPPLIER_TOOLS, execute_supplier_tool
-        
-        # Get recent sent emails that need responses
-        recent_sent = self.get_all_emails(mailbox="outbox")
-        
-        for sent_email in recent_sent:
-            # Skip if we already have a response to this email
-            if any(email.subject.startswith("Re:") and sent_email.subject in email.subject 
-                   for email in self.inbox):
+        """Generate AI responses to recent outgoing emails using recipient profiles
+
+        Responses for distinct emails are independent and network-bound, so
+        they are generated concurrently (bounded fanout).
+        """
+        # Only outbox emails still awaiting a reply - no mailbox copy or scan
+        to_answer = list(self._pending_responses.values())
+        if not to_answer:
+            return
+
+        async def _generate_all():
+            semaphore = asyncio.Semaphore(SUPPLIER_RESPONSE_CONCURRENCY)
+
+            async def _respond(sent_email):
+                async with semaphore:
+                    return await asyncio.to_thread(self._build_response, sent_email)
+
+            return await asyncio.gather(*(_respond(sent_email) for sent_email in to_answer))
+
+        results = asyncio.run(_generate_all())
+
+        # Apply results serially on the calling thread - tool execution and
+        # receive_email mutate the simulation and the mailboxes
+        for sent_email, result in zip(to_answer, results):
+            if isinstance(result, Exception):
+                # Fallback response if AI generation failed
+                fallback = f"We acknowledge your inquiry and will follow up shortly. (Error: {result})"
+                self.receive_email(
+                    sender=sent_email.recipient,
+                    subject=f"Re: {sent_email.subject}",
+                    body=fallback,
+                    email_type="response"
+                )
                 continue
-            
-            # Get enhanced context for response (recipient + products information)
-            response_context = self.get_response_context(
-                sent_email.recipient, 
-                sent_email.subject, 
-                sent_email.body
+
+            tool_calls = result.get("tool_calls")
+            tool_msg = None
+            if tool_calls:
+                tool_result = execute_supplier_tool(tool_calls[0], simulation_ref)
+                tool_msg = tool_result.get('message')
+
+            body_text = (result.get("content", "") or "").strip()
+            if tool_msg:
+                body_text += tool_msg
+
+            self.receive_email(
+                sender=sent_email.recipient,
+                subject=f"Re: {sent_email.subject}",
+                body=body_text,
+                email_type="response"
             )
-             
-            # Generate response using enhanced context
-            response_prompt = f"""You are a recipient who may be a supplier responding to this email inquiry.
+
+    def _build_response(self, sent_email):
+        """Network-bound half of one supplier response: context search + model call
+
+        Runs on worker threads; returns the model result dict, or the
+        exception if generation failed (applied as a fallback by the caller).
+        """
+
+        # Get enhanced context for response (recipient + products information)
+        response_context = self.get_response_context(
+            sent_email.recipient,
+            sent_email.subject,
+            sent_email.body
+        )
+
+        # Generate response using enhanced context
+        response_prompt = f"""You are a recipient who may be a supplier responding to this email inquiry.
 
 SUPPLIER & PRODUCT CONTEXT:
 {response_context}
@@ -224,34 +341,9 @@ If you are confirming a shipment, you MAY call the tool `schedule_delivery` with
 Only call the tool if the email includes sufficient details (product names, quantities, and unit pricing). Otherwise, reply asking for the missing info and DO NOT call the tool.
 
 Keep the response realistic and business-like. Format as just the email body text."""
-            
-            try:
-                # Allow supplier LLM to schedule deliveries via tool calls
-                response = call_model(response_prompt, tools=SUPPLIER_TOOLS)
-
-                # If a tool call is present, execute the first one
-                tool_calls = response.get("tool_calls")
-                tool_msg = None
-                if tool_calls:
-                    tool_result = execute_supplier_tool(tool_calls[0], simulation_ref)
-                    tool_msg = tool_result.get('message')
-
-                body_text = (response.get("content", "") or "").strip()
-                if tool_msg:
-                    body_text += tool_msg
 
-                self.receive_email(
-                    sender=sent_email.recipient,
-                    subject=f"Re: {sent_email.subject}",
-                    body=body_text,
-                    email_type="response"
-                )
-            except Exception as e:
-                # Fallback response if AI generation/tools fail
-                fallback = f"We acknowledge your inquiry and will follow up shortly. (Error: {e})"
-                self.receive_email(
-                    sender=sent_email.recipient,
-                    subject=f"Re: {sent_email.subject}",
-                    body=fallback,
-                    email_type="response"
-                )
+        try:
+            # Allow supplier LLM to schedule deliveries via tool calls
+            return call_model(response_prompt, tools=SUPPLIER_TOOLS)
+        except Exception as e:
+            return e
@@ -11,6 +11,40 @@ from storage import StorageSystem
 STARTING_BALANCE = 500
 DAILY_FEE = 2
 
+_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June',
+           'July', 'August', 'September', 'October', 'November', 'December')
+# Season by month number (index 0 pads for 1-based months)
+_SEASONS = (None, 'Winter', 'Winter', 'Spring', 'Spring', 'Spring',
+            'Summer', 'Summer', 'Summer', 'Fall', 'Fall', 'Fall', 'Winter')
+
+# Static report skeleton - a single %-format fill is cheaper than
+# re-driving the f-string machinery for every slot each call
+_REPORT_TMPL = """DAILY BUSINESS REPORT - %s at %s
+=================================================================
+
+FINANCIAL STATUS:
+- Current Balance: $%s
+- Days in Operation: %d
+- Daily Fee: $%d
+
+ENVIRONMENTAL CONDITIONS:
+- Weather: %s
+- Season: %s
+
+OPERATIONAL STATUS:
+- Total Messages/Actions: %d
+- Simulation ID: %s
+- Unread Emails: %d
+
+INVENTORY: (Placeholder - to be implemented)
+- [Inventory details will be added when vending machine integration is complete]
+
+YESTERDAY'S SALES: (Placeholder - to be implemented)
+- [Sales data will be added when sales simulation is integrated]
+
+ACTION REQUIRED: Continue managing your vending machine business."""
+
 class VendingMachineSimulation:
     def __init__(self, store_state=True):
         self.simulation_id = str(uuid.uuid4())
@@ -18,13 +52,15 @@ class VendingMachineSimulation:
         # Backroom storage system (handles inventory AND deliveries)
         self.storage = StorageSystem()
         # Start at 6:00 AM UTC - the daily anchor time
-        now = datetime.now(timezone.utc)
-        self.current_time = datetime(now.year, now.month, now.day, 6, 0, 0, tzinfo=timezone.utc)
+        self.current_time = datetime.now(timezone.utc).replace(hour=6, minute=0, second=0, microsecond=0)
         # Initialize counters
         self.message_count = 0
         self.days_passed = 0
         # Initialize weather
         self.current_weather = "sunny"  # Start with sunny weather
+        # Cached formatted date for the daily report header
+        self._cached_day_key = None
+        self._cached_date_str = ""
         # Initialize email system
         self.email_system = EmailSystem()
         # Initialize database
@@ -39,73 +75,70 @@ class VendingMachineSimulation:
 
     def get_day_of_week(self):
         """Get current day of the week"""
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        return days[self.current_time.weekday()]
-    
+        return _DAYS[self.current_time.weekday()]
+
     def get_month(self):
         """Get current month name"""
-        months = ['January', 'February', 'March', 'April', 'May', 'June',
-                 'July', 'August', 'September', 'October', 'November', 'December']
-        return months[self.current_time.month - 1]
+        return _MONTHS[self.current_time.month - 1]
     
     def log_state(self):
         """Log current state to database"""
-        self.db.log_state(self.simulation_id, self.current_time, self.balance)
+        self.db.log_state(self.simulation_id, self.current_time.isoformat(), self.balance)
     
     def advance_time(self, days=0, minutes=0):
         """Advance simulation time by specified days and minutes"""
         self.current_time += timedelta(days=days, minutes=minutes)
         return self.current_time
-    
-    def get_day_report(self):
-        """Generate comprehensive daily report for the agent"""
-        day_of_week = self.get_day_of_week()
-        month = self.get_month()
-        day = self.current_time.day
-        year = self.current_time.year
-        time_str = self.current_time.strftime("%H:%M UTC")
-        
-        report = f"""
-DAILY BUSINESS REPORT - {day_of_week}, {month} {day}, {year} at {time_str}
-=================================================================
 
-FINANCIAL STATUS:
-- Current Balance: ${self.balance}
-- Days in Operation: {self.days_passed}
-- Daily Fee: ${DAILY_FEE}
+    def fast_forward(self, days):
+        """Skip ahead N days without agent actions (benchmarking/Monte Carlo)
 
-ENVIRONMENTAL CONDITIONS:
-- Weather: {self.current_weather}
-- Season: {self.get_season()}
+        Applies the daily fees as one subtraction and emits the per-day
+        state rows through the database's batched logger instead of running
+        the per-day loop.
+        """
+        if days <= 0:
+            return self.current_time
 
-OPERATIONAL STATUS:
-- Total Messages/Actions: {self.message_count}
-- Simulation ID: {self.simulation_id}
-- Unread Emails: {len(self.email_system.get_unread_emails())}
+        start_time = self.current_time
+        start_balance = self.balance
+        self.balance -= DAILY_FEE * days
+        self.days_passed += days
+        self.current_time += timedelta(days=days)
 
-INVENTORY: (Placeholder - to be implemented)
-- [Inventory details will be added when vending machine integration is complete]
+        if self.store_state:
+            for i in range(1, days + 1):
+                self.db.log_state(
+                    self.simulation_id,
+                    (start_time + timedelta(days=i)).isoformat(),
+                    start_balance - DAILY_FEE * i
+                )
 
-YESTERDAY'S SALES: (Placeholder - to be implemented)
-- [Sales data will be added when sales simulation is integrated]
+        return self.current_time
+    
+    def get_day_report(self):
+        """Generate comprehensive daily report for the agent"""
+        # The formatted date only changes when the day does - cache it
+        day_key = self.current_time.toordinal()
+        if day_key != self._cached_day_key:
+            self._cached_day_key = day_key
+            self._cached_date_str = (f"{self.get_day_of_week()}, {self.get_month()} "
+                                     f"{self.current_time.day}, {self.current_time.year}")
+        time_str = self.current_time.strftime("%H:%M UTC")
 
-ACTION REQUIRED: Continue managing your vending machine business.
-"""
-        return report.strip()
+        return _REPORT_TMPL % (
+            self._cached_date_str, time_str,
+            self.balance, self.days_passed, DAILY_FEE,
+            self.current_weather, self.get_season(),
+            self.message_count, self.simulation_id,
+            self.email_system.get_email_count()['unread']
+        )
         
     def get_season(self):
         """Get current season based on month"""
-        month = self.current_time.month
-        if month in [12, 1, 2]:
-            return "Winter"
-        elif month in [3, 4, 5]:
-            return "Spring"
-        elif month in [6, 7, 8]:
-            return "Summer"
-        else:
-            return "Fall"
-    
-        
+        return _SEASONS[self.current_time.month]
+
+
     def handle_new_day(self):
         """Handle daily processing and return daily report"""
         # New day processing
@@ -1,9 +1,150 @@
+import hashlib
 import requests
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
-import litellm
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+try:
+    import orjson  # C-extension JSON for request/response bodies
+except ImportError:
+    orjson = None
+
+# Shared session so repeat API calls reuse pooled TCP/TLS connections,
+# with automatic backoff retries on transient failures
+_session = None
+
+class TokenBucket:
+    """Client-side rate shaper - callers block until a request token is free
+
+    Keeps bursty callers (concurrent supplier responses, batch analyses)
+    under provider limits instead of burning latency on 429 retries.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate = rate_per_sec
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token if available; return 0.0 on success else seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            wait = self._take()
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Async variant - awaits instead of blocking the event loop"""
+        import asyncio
+        while True:
+            wait = self._take()
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+# ~50 requests/minute with room for a 10-call burst
+_MODEL_BUCKET = TokenBucket(rate_per_sec=50 / 60, burst=10)
+
+_CLAUDE_URL = "https://api.anthropic.com/v1/messages"
+
+# Header dict built once on first call (not at import - the API key may be
+# loaded into the environment after this module is imported)
+_claude_headers = None
+
+def _get_claude_headers() -> dict:
+    global _claude_headers
+    if _claude_headers is None:
+        api_key = os.environ.get('ANTHROPIC_API_KEY')
+        if not api_key:
+            raise ValueError("API key must be provided or set in ANTHROPIC_API_KEY environment variable")
+        _claude_headers = {
+            "Content-Type": "application/json",
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01"
+        }
+    return _claude_headers
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504, 529),
+                allowed_methods=frozenset(["POST"])
+            )
+        ))
+    return _session
+
+
+# Map common model types to LiteLLM identifiers
+MODEL_MAPPING = {
+    "claude-4-opus": "anthropic/claude-opus-4-20250514",
+    "claude-4-sonnet": "anthropic/claude-sonnet-4-20250514",
+    "grok-3-beta": "xai/grok-3-beta",
+    "grok-3-mini": "xai/grok-3-mini-beta",
+    "o3-mini": "openai/o3-mini",
+    "o3-pro": "openai/o3-pro",
+    "gpt-4o": "openai/gpt-4o",
+    "gemini-2.5-pro": "vertex_ai/gemini-2.5-pro",
+    "gemini-2.5-flash": "vertex_ai/gemini-2.5-flash"
+}
+
+_ROUTED_MODELS = frozenset(MODEL_MAPPING.values())
+
+# Shared litellm Router over the known model ids - reuses provider client
+# pools across calls instead of letting litellm build them per request
+_router = None
+
+def _get_router():
+    global _router
+    if _router is None:
+        import litellm
+        _router = litellm.Router(
+            model_list=[
+                {"model_name": litellm_id, "litellm_params": {"model": litellm_id}}
+                for litellm_id in MODEL_MAPPING.values()
+            ],
+            num_retries=5,
+            timeout=120
+        )
+    return _router
+
+# LRU cache of completed responses - identical deterministic requests
+# (eval reruns, repeated analyses) skip the network round trip entirely.
+# Lock-guarded: call_model runs on worker threads in the supplier fanout.
+_RESP_CACHE: OrderedDict = OrderedDict()
+_RESP_CACHE_MAX = 4096
+_RESP_CACHE_LOCK = threading.Lock()
+
+def _response_cache_key(model: str, system_prompt: str, prompt, messages, tools) -> str:
+    payload = json.dumps(
+        {"m": model, "s": system_prompt, "p": prompt, "msgs": messages, "t": tools},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
 
 
 def call_claude_model(prompt: str, system_prompt: str = "") -> str:
@@ -17,21 +158,12 @@ def call_claude_model(prompt: str, system_prompt: str = "") -> str:
         The model's response as a string
     """
     
-    # Get API key from parameter or environment
-    api_key = os.environ['ANTHROPIC_API_KEY']
-    if not api_key:
-        raise ValueError("API key must be provided or set in ANTHROPIC_API_KEY environment variable")
-    
-    # API endpoint
-    url = "https://api.anthropic.com/v1/messages"
-    
-    # Headers
-    headers = {
-        "Content-Type": "application/json",
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01"
-    }
-    
+    _MODEL_BUCKET.acquire()
+
+    # Cached endpoint + headers (validates the API key on first use)
+    url = _CLAUDE_URL
+    headers = _get_claude_headers()
+
     # Request payload
     payload = {
         "model": "claude-sonnet-4-20250514",  # Latest Sonnet model
@@ -46,12 +178,15 @@ def call_claude_model(prompt: str, system_prompt: str = "") -> str:
     }
     
     try:
-        # Make the API request
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        # Parse response
-        response_data = response.json()
+        # Make the API request on the pooled session
+        if orjson is not None:
+            response = _get_session().post(url, headers=headers, data=orjson.dumps(payload))
+            response.raise_for_status()  # Raise exception for bad status codes
+            response_data = orjson.loads(response.content)
+        else:
+            response = _get_session().post(url, headers=headers, json=payload)
+            response.raise_for_status()
+            response_data = response.json()
         
         # Extract the text content from the response
         if 'content' in response_data and len(response_data['content']) > 0:
@@ -82,90 +217,228 @@ def call_claude_with_fallback(prompt: str) -> str:
         return "Mock response: -1.0,2.00,10"  # Example format for economic analysis
 
 
-def call_model_litellm(prompt: str, model: str = "claude-3-5-sonnet-20241022", system_prompt: str = "", tools: list = None) -> dict:
+def call_model_litellm(prompt: str = None, model: str = "claude-3-5-sonnet-20241022", system_prompt: str = "", tools: list = None, messages: list = None) -> dict:
     """
     Call model using LiteLLM unified interface with optional tools support
-    
+
     Args:
-        prompt: The text prompt to send to the model
+        prompt: The text prompt to send to the model (ignored if messages given)
         model: Model identifier (e.g., "claude-3-5-sonnet-20241022", "gpt-4", "openai/gpt-3.5-turbo")
         system_prompt: System prompt for the model
         tools: List of tool schemas for function calling
-    
+        messages: Pre-built chat messages list ({role, content} dicts); callers
+            with structured history pass this instead of a flattened prompt
+
     Returns:
         Dict containing response content and any tool calls
     """
     try:
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
-        
+        if messages is None:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+        cache_key = _response_cache_key(model, system_prompt, prompt, messages, tools)
+        with _RESP_CACHE_LOCK:
+            cached = _RESP_CACHE.get(cache_key)
+            if cached is not None:
+                _RESP_CACHE.move_to_end(cache_key)
+                return cached
+
         completion_params = {
             "model": model,
             "messages": messages,
             "max_tokens": 1000,
+            "num_retries": 5,  # litellm-level backoff on transient provider errors
         }
-        
+
         # Add tools if provided
         if tools:
             completion_params["tools"] = tools
-            
-        response = litellm.completion(**completion_params)
-        
+
+        import litellm  # deferred - pulls in dozens of provider deps
+        _MODEL_BUCKET.acquire()
+
+        # Known models route through the shared Router (pooled provider
+        # clients); anything else falls back to a one-off completion
+        if model in _ROUTED_MODELS:
+            response = _get_router().completion(**completion_params)
+        else:
+            response = litellm.completion(**completion_params)
+
         message = response.choices[0].message
         tool_calls = getattr(message, 'tool_calls', None)
-        
+
         # Restrict to single tool call only (VendingBench pattern)
         if tool_calls and len(tool_calls) > 1:
             print(f"🔧 Multiple tool calls detected ({len(tool_calls)}), using first only")
             tool_calls = [tool_calls[0]]
-        
+
+        result = {
+            "content": message.content,
+            "tool_calls": tool_calls
+        }
+
+        with _RESP_CACHE_LOCK:
+            _RESP_CACHE[cache_key] = result
+            if len(_RESP_CACHE) > _RESP_CACHE_MAX:
+                _RESP_CACHE.popitem(last=False)
+
+        return result
+
+    except Exception as e:
+        return {
+            "content": "Error: LiteLLM request failed: " + str(e),
+            "tool_calls": None
+        }
+
+def call_model_litellm_stream(prompt: str = None, model: str = "claude-3-5-sonnet-20241022",
+                              system_prompt: str = "", tools: list = None, messages: list = None):
+    """
+    Streaming variant of call_model_litellm - yields content deltas as they
+    arrive so callers can act on early tokens instead of waiting for the
+    full generation. Yields str chunks; if the request or stream fails, the
+    final chunk is an "Error: LiteLLM request failed: ..." sentinel
+    (mirroring the non-streaming error contract), so callers should check
+    for it before treating the joined output as model content.
+    """
+    try:
+        import litellm  # deferred - pulls in dozens of provider deps
+
+        if messages is None:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+        completion_params = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": 1000,
+            "stream": True,
+        }
+
+        if tools:
+            completion_params["tools"] = tools
+
+        _MODEL_BUCKET.acquire()
+
+        for chunk in litellm.completion(**completion_params):
+            delta = chunk.choices[0].delta
+            content = getattr(delta, 'content', None)
+            if content:
+                yield content
+
+    except Exception as e:
+        yield "Error: LiteLLM request failed: " + str(e)
+
+async def call_model_async(prompt: str = None, model: str = "anthropic/claude-sonnet-4-20250514",
+                           system_prompt: str = "", tools: list = None, messages: list = None) -> dict:
+    """
+    Async twin of call_model_litellm using litellm.acompletion
+
+    litellm owns the HTTP transport (async httpx underneath), so callers can
+    await many of these in parallel without thread workers.
+    """
+    try:
+        if messages is None:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+        completion_params = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": 1000,
+            "num_retries": 5,  # litellm-level backoff on transient provider errors
+        }
+
+        if tools:
+            completion_params["tools"] = tools
+
+        import litellm  # deferred - pulls in dozens of provider deps
+        await _MODEL_BUCKET.acquire_async()
+
+        response = await litellm.acompletion(**completion_params)
+
+        message = response.choices[0].message
+        tool_calls = getattr(message, 'tool_calls', None)
+
+        # Restrict to single tool call only (VendingBench pattern)
+        if tool_calls and len(tool_calls) > 1:
+            print(f"🔧 Multiple tool calls detected ({len(tool_calls)}), using first only")
+            tool_calls = [tool_calls[0]]
+
         return {
             "content": message.content,
             "tool_calls": tool_calls
         }
-        
+
     except Exception as e:
         return {
             "content": "Error: LiteLLM request failed: " + str(e),
             "tool_calls": None
         }
 
-def call_model(prompt: str, model_type: str = "claude-4-sonnet", system_prompt: str = "", tools: list = None):
+async def call_models_async(prompts: list, model: str = "anthropic/claude-sonnet-4-20250514",
+                            system_prompt: str = "", tools: list = None) -> list:
+    """Await many independent model calls in parallel, preserving order"""
+    import asyncio
+    return await asyncio.gather(
+        *(call_model_async(prompt, model, system_prompt, tools) for prompt in prompts)
+    )
+
+async def acall_model_batch(prompts: list, model_type: str = "claude-4-sonnet",
+                            system_prompt: str = "", tools: list = None,
+                            max_concurrency: int = 10) -> list:
+    """
+    Batch many independent prompts with bounded concurrency
+
+    Accepts the same friendly model_type names as call_model; results come
+    back in prompt order. Concurrency is capped with a semaphore so large
+    batches don't blow through provider rate limits.
+    """
+    import asyncio
+
+    litellm_model = MODEL_MAPPING.get(model_type.lower(), model_type)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _one(prompt):
+        async with semaphore:
+            return await call_model_async(prompt, litellm_model, system_prompt, tools)
+
+    return await asyncio.gather(*(_one(prompt) for prompt in prompts))
+
+def call_model(prompt: str = None, model_type: str = "claude-4-sonnet", system_prompt: str = "", tools: list = None, messages: list = None, stream: bool = False):
     """
     Universal model client using LiteLLM for unified interface
-    
+
     Args:
-        prompt: The text prompt to send to the model
+        prompt: The text prompt to send to the model (ignored if messages given)
         model_type: Which model to use ("claude", "gpt-4", "gpt-3.5", etc.)
         system_prompt: System prompt for the model
         tools: List of tool schemas for function calling
-    
+        messages: Pre-built chat messages list, used instead of prompt
+        stream: When True, return an iterator of content deltas instead of
+            waiting for the full response
+
     Returns:
-        str if no tools provided, dict with content and tool_calls if tools provided
+        dict with content and tool_calls; or an iterator of str chunks when
+        stream=True
     """
-    
-    # Map common model types to LiteLLM identifiers
-    model_mapping = {
-        "claude-4-opus": "anthropic/claude-opus-4-20250514",
-        "claude-4-sonnet": "anthropic/claude-sonnet-4-20250514", 
-        "grok-3-beta": "xai/grok-3-beta",
-        "grok-3-mini": "xai/grok-3-mini-beta",
-        "o3-mini": "openai/o3-mini",
-        "o3-pro": "openai/o3-pro",
-        "gpt-4o": "openai/gpt-4o",
-        "gemini-2.5-pro": "vertex_ai/gemini-2.5-pro",
-        "gemini-2.5-flash": "vertex_ai/gemini-2.5-flash"
-    }
-    
+
     # Use mapped model or the provided model_type directly
-    litellm_model = model_mapping.get(model_type.lower(), model_type)
-    
+    litellm_model = MODEL_MAPPING.get(model_type.lower(), model_type)
+
+    if stream:
+        return call_model_litellm_stream(prompt, litellm_model, system_prompt, tools, messages)
+
     try:
-        result = call_model_litellm(prompt, litellm_model, system_prompt, tools)
-        
+        result = call_model_litellm(prompt, litellm_model, system_prompt, tools, messages)
+
         return result
-        
+
     except Exception as e:
         raise ValueError(f"Model type '{model_type}' failed with LiteLLM: {e}")
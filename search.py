@@ -1,43 +1,174 @@
 import os
+import random
 import requests
 import json
+import threading
+import time
+from functools import lru_cache
 from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson  # C-extension JSON for request/response bodies
+except ImportError:
+    orjson = None
+
+# Transient statuses worth retrying (429 rate limit, 5xx, 529 overloaded)
+_RETRY_STATUSES = {429, 500, 502, 503, 529}
+_RETRY_ATTEMPTS = 5
+
+# ~30 searches/minute with a small burst allowance (cache hits skip this)
+from model_client import TokenBucket
+_SEARCH_BUCKET = TokenBucket(rate_per_sec=30 / 60, burst=5)
+
+# Shared session so repeat searches reuse pooled TCP/TLS connections
+_session = None
+_session_lock = threading.Lock()
+
+_PPLX_URL = "https://api.perplexity.ai/chat/completions"
+
+# Header dict built once on first call (not at import - the API key may be
+# loaded into the environment after this module is imported)
+_pplx_headers = None
+
+def _get_pplx_headers():
+    global _pplx_headers
+    if _pplx_headers is None:
+        api_key = os.getenv("PERPLEXITY_API_KEY")
+        if not api_key:
+            return None
+        _pplx_headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+    return _pplx_headers
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+        return _session
+
+# Disk-backed cache of search results keyed by normalized query - the same
+# suppliers and products are looked up over and over across a simulation.
+# Failures are negative-cached briefly (in memory) so transient errors don't
+# hammer the API, but are never persisted.
+SEARCH_CACHE_PATH = "search_cache.json"
+NEGATIVE_CACHE_TTL = 300  # seconds
+_search_cache = None
+_negative_cache: Dict[str, tuple] = {}  # query -> (result tuple, timestamp)
+_search_cache_lock = threading.Lock()  # searches run on worker threads
+
+
+def _get_search_cache() -> Dict:
+    """Load the persistent search cache on first use"""
+    global _search_cache
+    if _search_cache is None:
+        try:
+            with open(SEARCH_CACHE_PATH) as f:
+                _search_cache = json.load(f)
+        except (OSError, ValueError):
+            _search_cache = {}
+    return _search_cache
+
+
+def _save_search_cache():
+    """Write the search cache back to its JSON sidecar"""
+    try:
+        with open(SEARCH_CACHE_PATH, "w", buffering=65536) as f:
+            json.dump(_search_cache, f)
+    except OSError:
+        pass  # Cache persistence is best-effort
+
+
+def _post_with_retry(url: str, **kwargs) -> requests.Response:
+    """POST with exponential backoff + jitter on transient failures
+
+    Retries timeouts, connection errors, and _RETRY_STATUSES responses up to
+    _RETRY_ATTEMPTS times; the last attempt's response or exception wins.
+    """
+    last_exc = None
+    for attempt in range(_RETRY_ATTEMPTS):
+        try:
+            response = _get_session().post(url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+            last_exc = None
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            last_exc = e
+
+        if attempt < _RETRY_ATTEMPTS - 1:
+            time.sleep(random.uniform(2, 4) * (attempt + 1))
+
+    if last_exc is not None:
+        raise last_exc
+    return response
 
 
 def search_perplexity(query: str) -> tuple[str, Optional[str]]:
     """
     Search using Perplexity API
-    
+
+    Successful results are cached (in memory and across runs); failures are
+    negative-cached for NEGATIVE_CACHE_TTL seconds.
+
     Args:
         query: The search query string
-        
+
     Returns:
         tuple: (content_string, error_string) where error_string is None if successful
     """
-    api_key = os.getenv("PERPLEXITY_API_KEY")
-    
-    if not api_key:
+    cache_key = " ".join(query.split())  # normalize whitespace
+
+    with _search_cache_lock:
+        cached = _get_search_cache().get(cache_key)
+        if cached is not None:
+            return cached[0], cached[1]
+        negative = _negative_cache.get(cache_key)
+        if negative is not None and time.time() - negative[1] < NEGATIVE_CACHE_TTL:
+            return negative[0]
+
+    content, error = _search_perplexity_uncached(query)
+
+    with _search_cache_lock:
+        if error is None:
+            _get_search_cache()[cache_key] = [content, None]
+            _save_search_cache()
+        else:
+            _negative_cache[cache_key] = ((content, error), time.time())
+
+    return content, error
+
+
+def _search_perplexity_uncached(query: str) -> tuple[str, Optional[str]]:
+    """Perform the actual Perplexity API request"""
+    headers = _get_pplx_headers()
+    if headers is None:
         return "Search unavailable - API key not configured", "PERPLEXITY_API_KEY environment variable not set"
-    
-    url = "https://api.perplexity.ai/chat/completions"
-    
+
+    _SEARCH_BUCKET.acquire()
+
+    url = _PPLX_URL
+
     payload = {
         "model": "sonar",
         "messages": [
             {"role": "user", "content": query}
         ]
     }
-    
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
+
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
+        if orjson is not None:
+            response = _post_with_retry(url, data=orjson.dumps(payload), headers=headers, timeout=30)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+        else:
+            response = _post_with_retry(url, json=payload, headers=headers, timeout=30)
+            response.raise_for_status()
+            data = response.json()
         
         if "choices" in data and len(data["choices"]) > 0:
             content = data["choices"][0]["message"]["content"]
@@ -53,6 +184,30 @@ def search_perplexity(query: str) -> tuple[str, Optional[str]]:
         return f"Search failed: {str(e)}", f"Unexpected error: {str(e)}"
 
 
+class _SearchFailure(Exception):
+    """Raised inside the memo so lru_cache never stores failed lookups"""
+
+    def __init__(self, content: str, error: str):
+        super().__init__(error)
+        self.content = content
+        self.error = error
+
+
+@lru_cache(maxsize=512)
+def _cached_search(query: str, bucket: int) -> tuple[str, Optional[str]]:
+    """Hourly-bucketed memo over search_perplexity - the bucket argument
+    rolls every hour, giving the wrapper queries a TTL. Failures surface as
+    _SearchFailure so they aren't pinned for the whole bucket."""
+    content, error = search_perplexity(query)
+    if error is not None:
+        raise _SearchFailure(content, error)
+    return content, None
+
+
+def _hour_bucket() -> int:
+    return int(time.time() // 3600)
+
+
 def search_suppliers(location: str = "United States", product_types: Optional[str] = None) -> tuple[str, Optional[str]]:
     """
     Search for wholesale suppliers for vending machine products
@@ -68,9 +223,11 @@ def search_suppliers(location: str = "United States", product_types: Optional[st
         query = f"wholesale suppliers {product_types} vending machine products {location} contact information email"
     else:
         query = f"wholesale suppliers vending machine snacks drinks candy {location} contact information email"
-    
-    content, error = search_perplexity(query)
-    return content, error
+
+    try:
+        return _cached_search(query, _hour_bucket())
+    except _SearchFailure as failure:
+        return failure.content, failure.error
 
 
 def search_product_info(product_name: str, info_type: str = "pricing") -> tuple[str, Optional[str]]:
@@ -85,6 +242,8 @@ def search_product_info(product_name: str, info_type: str = "pricing") -> tuple[
         tuple: (content_string, error_string) where error_string is None if successful
     """
     query = f"{product_name} wholesale {info_type} vending machine supplier cost price"
-    
-    content, error = search_perplexity(query)
-    return content, error
\ No newline at end of file
+
+    try:
+        return _cached_search(query, _hour_bucket())
+    except _SearchFailure as failure:
+        return failure.content, failure.error
\ No newline at end of file
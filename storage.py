@@ -1,19 +1,48 @@
 """
 Storage system for managing backroom inventory and deliveries
 """
+import heapq
+import itertools
 from typing import Dict, Optional, List, Callable
 from datetime import datetime, timedelta
 from vending_machine import Item
 
 
+# Prebound row formatter and sort key for storage reports - avoids
+# rebuilding the format template / lambda per call
+_REPORT_ROW = "  [{:5}] {:20} {:3} units @ ${:.2f}/unit (Value: ${:.2f})".format
+
+def _report_sort_key(entry):
+    # False (large) sorts before True (small); alphabetical within size
+    return (entry[1].item.size == "small", entry[0])
+
+
+class _Record:
+    """Per-product storage record - slots keep hundreds of SKUs compact"""
+    __slots__ = ("item", "quantity", "avg_unit_cost")
+
+    def __init__(self, item: Item, quantity: int = 0, avg_unit_cost: float = 0.0):
+        self.item = item
+        self.quantity = quantity
+        self.avg_unit_cost = avg_unit_cost
+
+
 class StorageSystem:
     """Manages backroom inventory for the vending machine business"""
 
     def __init__(self):
-        # Storage dict: {item_name: {"item": Item, "quantity": int, "avg_unit_cost": float}}
-        self.items: Dict[str, Dict] = {}
-        # Pending deliveries: [{arrival_time, supplier, items, reference}]
-        self.pending_deliveries: List[Dict] = []
+        # Storage records: {item_name: _Record(item, quantity, avg_unit_cost)}
+        self.items: Dict[str, _Record] = {}
+        # Pending deliveries as a min-heap of (arrival_time, seq, delivery)
+        # so due-date checks only ever touch the earliest entry
+        self._delivery_heap: List[tuple] = []
+        self._delivery_counter = itertools.count()  # tie-break equal arrival times
+        # Item names bucketed by size, so size lookups skip the full scan
+        self._by_size: Dict[str, set] = {"small": set(), "large": set()}
+        # Lazily sorted (name, record) pairs for reports; None when stale
+        self._sorted_items_cache = None
+        # Running sum of quantity * avg_unit_cost across all records
+        self._total_value = 0.0
 
     def add_items(self, name: str, size: str, quantity: int, unit_cost: float, price: float = 0.0) -> float:
         """
@@ -29,29 +58,34 @@ class StorageSystem:
         Returns:
             Total cost of added items (quantity * unit_cost)
         """
+        # Normalize at the public boundary; the fast path trusts its types
+        return self._add_items_fast(name, size, int(quantity), float(unit_cost), price)
+
+    def _add_items_fast(self, name: str, size: str, quantity: int, unit_cost: float, price: float = 0.0) -> float:
+        """add_items without the boundary casts - for callers (like
+        process_arrivals) that already validated their numbers"""
         if name not in self.items:
             # Create new Item and storage record
-            item = Item(name, size, price, unit_cost)
-            self.items[name] = {
-                "item": item,
-                "quantity": 0,
-                "avg_unit_cost": 0.0
-            }
+            self.items[name] = _Record(Item(name, size, price, unit_cost))
+            self._by_size.setdefault(size, set()).add(name)
+            self._sorted_items_cache = None
 
         record = self.items[name]
+        old_value = record.quantity * record.avg_unit_cost
 
         # Update weighted average cost
-        total_qty = record["quantity"] + quantity
+        total_qty = record.quantity + quantity
         if total_qty > 0:
-            total_cost = (record["avg_unit_cost"] * record["quantity"]) + (unit_cost * quantity)
-            record["avg_unit_cost"] = total_cost / total_qty
+            total_cost = (record.avg_unit_cost * record.quantity) + (unit_cost * quantity)
+            record.avg_unit_cost = total_cost / total_qty
 
-        record["quantity"] = total_qty
+        record.quantity = total_qty
+        self._total_value += total_qty * record.avg_unit_cost - old_value
 
         # Update the Item's cost with new average
-        record["item"].cost = record["avg_unit_cost"]
+        record.item.cost = record.avg_unit_cost
 
-        return float(unit_cost) * int(quantity)
+        return unit_cost * quantity
 
     def remove_items(self, name: str, quantity: int) -> bool:
         """
@@ -64,32 +98,30 @@ class StorageSystem:
         Returns:
             True if successful, False if insufficient quantity
         """
-        if name not in self.items:
-            return False
-
-        record = self.items[name]
-        if record["quantity"] < quantity:
+        record = self.items.get(name)
+        if record is None or record.quantity < quantity:
             return False
 
-        record["quantity"] -= quantity
+        record.quantity -= quantity
+        self._total_value -= quantity * record.avg_unit_cost
 
         # Remove item from storage if quantity reaches 0
-        if record["quantity"] == 0:
+        if record.quantity == 0:
+            self._by_size[record.item.size].discard(name)
+            self._sorted_items_cache = None
             del self.items[name]
 
         return True
 
     def get_quantity(self, name: str) -> int:
         """Get quantity of a specific item in storage"""
-        if name not in self.items:
-            return 0
-        return self.items[name]["quantity"]
+        record = self.items.get(name)
+        return record.quantity if record is not None else 0
 
     def get_item(self, name: str) -> Optional[Item]:
         """Get Item object for a specific product"""
-        if name not in self.items:
-            return None
-        return self.items[name]["item"]
+        record = self.items.get(name)
+        return record.item if record is not None else None
 
     def list_all_items(self) -> List[str]:
         """Get list of all item names in storage"""
@@ -102,16 +134,16 @@ class StorageSystem:
         """
         return {
             name: {
-                "size": record["item"].size,
-                "quantity": record["quantity"],
-                "avg_unit_cost": record["avg_unit_cost"]
+                "size": record.item.size,
+                "quantity": record.quantity,
+                "avg_unit_cost": record.avg_unit_cost
             }
             for name, record in self.items.items()
         }
 
     def get_total_value(self) -> float:
-        """Calculate total value of all items in storage"""
-        return sum(record["quantity"] * record["avg_unit_cost"] for record in self.items.values())
+        """Total value of all items in storage (maintained incrementally)"""
+        return self._total_value
 
     def is_empty(self) -> bool:
         """Check if storage is empty"""
@@ -119,11 +151,7 @@ class StorageSystem:
 
     def get_items_by_size(self, size: str) -> List[Item]:
         """Get all Item objects of a specific size"""
-        return [
-            record["item"]
-            for record in self.items.values()
-            if record["item"].size == size
-        ]
+        return [self.items[name].item for name in self._by_size.get(size, ())]
 
     def update_price(self, name: str, new_price: float) -> bool:
         """
@@ -136,10 +164,11 @@ class StorageSystem:
         Returns:
             True if successful, False if item not found
         """
-        if name not in self.items:
+        record = self.items.get(name)
+        if record is None:
             return False
 
-        self.items[name]["item"].price = new_price
+        record.item.price = new_price
         return True
 
     def schedule_delivery(self, current_time: datetime, items: List[Dict], days_until_delivery: int,
@@ -160,15 +189,20 @@ class StorageSystem:
         # Calculate arrival time at 6:00 AM
         arrival = current_time.replace(hour=6, minute=0, second=0, microsecond=0) + timedelta(days=days_until_delivery)
 
-        self.pending_deliveries.append({
+        heapq.heappush(self._delivery_heap, (arrival, next(self._delivery_counter), {
             "arrival_time": arrival,
             "supplier": supplier,
             "items": items,
             "reference": reference,
-        })
+        }))
 
         return arrival
 
+    @property
+    def pending_deliveries(self) -> List[Dict]:
+        """Pending delivery payloads (unordered view over the heap)"""
+        return [delivery for _, _, delivery in self._delivery_heap]
+
     def process_arrivals(self, current_time: datetime,
                         on_arrival: Optional[Callable[[str, Optional[str], str], None]] = None) -> float:
         """
@@ -181,55 +215,54 @@ class StorageSystem:
         Returns:
             Total cost of all processed deliveries
         """
-        if not self.pending_deliveries:
-            return 0.0
-
         total_cost = 0.0
-        remaining = []
-
-        for delivery in self.pending_deliveries:
-            if delivery["arrival_time"] <= current_time:
-                supplier = delivery.get("supplier", "Supplier")
-                ref = delivery.get("reference")
 
-                # Process items and build delivery notice
-                lines = []
-                delivery_cost = 0.0
-
-                for item in delivery.get("items", []):
-                    name = item.get("name")
-                    size = item.get("size", "small")
-                    qty = int(item.get("quantity", 0))
-                    unit_cost = float(item.get("unit_cost", 0.0))
-
-                    if qty <= 0 or not name:
-                        continue
-
-                    # Add to storage
-                    item_cost = self.add_items(name, size, qty, unit_cost)
-                    delivery_cost += item_cost
+        # Due deliveries sit at the top of the heap - pop until the earliest
+        # remaining one is in the future
+        while self._delivery_heap and self._delivery_heap[0][0] <= current_time:
+            _, _, delivery = heapq.heappop(self._delivery_heap)
+            supplier = delivery.get("supplier", "Supplier")
+            ref = delivery.get("reference")
+
+            # Process items; notice lines are only formatted when someone
+            # will actually receive them
+            build_notice = on_arrival is not None
+            lines = []
+            delivery_cost = 0.0
+
+            for item in delivery.get("items", []):
+                name = item.get("name")
+                size = item.get("size", "small")
+                qty = int(item.get("quantity", 0))
+                unit_cost = float(item.get("unit_cost", 0.0))
+
+                if qty <= 0 or not name:
+                    continue
+
+                # Add to storage (qty/unit_cost already cast above)
+                item_cost = self._add_items_fast(name, size, qty, unit_cost)
+                delivery_cost += item_cost
+                if build_notice:
                     lines.append(f"- {name} ({size}) x{qty} @ ${unit_cost:.2f}")
 
-                total_cost += delivery_cost
-
-                # Send delivery notice via callback if provided
-                if on_arrival:
-                    body_lines = [
-                        f"Delivery has arrived from {supplier}.",
-                        f"Reference: {ref}" if ref else None,
-                        f"Arrival Time (UTC): {delivery['arrival_time'].strftime('%Y-%m-%d %H:%M')}",
-                        "",
-                        "Items:",
-                        *lines,
-                        "",
-                        f"Total billed on delivery: ${delivery_cost:.2f}",
-                    ]
-                    body = "\n".join([l for l in body_lines if l is not None])
-                    on_arrival(supplier, ref, body)
-            else:
-                remaining.append(delivery)
-
-        self.pending_deliveries = remaining
+            total_cost += delivery_cost
+
+            # Send delivery notice via callback if provided
+            if build_notice:
+                arrival_str = delivery['arrival_time'].strftime('%Y-%m-%d %H:%M')
+                body_lines = [
+                    f"Delivery has arrived from {supplier}.",
+                    f"Reference: {ref}" if ref else None,
+                    f"Arrival Time (UTC): {arrival_str}",
+                    "",
+                    "Items:",
+                    *lines,
+                    "",
+                    f"Total billed on delivery: ${delivery_cost:.2f}",
+                ]
+                body = "\n".join(l for l in body_lines if l is not None)
+                on_arrival(supplier, ref, body)
+
         return total_cost
 
     def get_storage_report(self) -> str:
@@ -244,21 +277,17 @@ class StorageSystem:
 
         report_lines = ["STORAGE INVENTORY REPORT", "=" * 50]
 
-        # Sort items: large first, then small (alphabetically within each)
-        sorted_items = sorted(
-            self.items.items(),
-            key=lambda x: (x[1]["item"].size == "small", x[0])  # False (large) sorts before True (small)
-        )
+        # Sort items: large first, then small (alphabetically within each).
+        # The order only changes when items come or go, so cache it.
+        if self._sorted_items_cache is None:
+            self._sorted_items_cache = sorted(self.items.items(), key=_report_sort_key)
+        sorted_items = self._sorted_items_cache
 
         for item_name, record in sorted_items:
-            item = record["item"]
-            qty = record["quantity"]
-            avg_cost = record["avg_unit_cost"]
-            total_value = qty * avg_cost
-            size_label = item.size.upper()
-
+            qty = record.quantity
+            avg_cost = record.avg_unit_cost
             report_lines.append(
-                f"  [{size_label:5}] {item_name:20} {qty:3} units @ ${avg_cost:.2f}/unit (Value: ${total_value:.2f})"
+                _REPORT_ROW(record.item.size.upper(), item_name, qty, avg_cost, qty * avg_cost)
             )
 
         # Summary
@@ -3,6 +3,51 @@ This file contains the tools that the primary agent can use to take actions.
 """
 from datetime import datetime, timedelta
 import json
+import logging
+import sys
+from types import MappingProxyType
+
+# Tool execution logs through a logger instead of print - no per-call flush,
+# and callers can swap in RingHandler to defer I/O. Explicitly on stdout so
+# the tool lines stay interleaved with the simulation's print output.
+logger = logging.getLogger("tools")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+
+class RingHandler(logging.Handler):
+    """Keep the last N records in memory; flush to a target handler in batches"""
+
+    def __init__(self, capacity: int = 4096, target: logging.Handler = None):
+        super().__init__()
+        from collections import deque
+        self.buffer = deque(maxlen=capacity)
+        self.target = target
+
+    def emit(self, record):
+        self.buffer.append(record)
+
+    def flush(self):
+        if self.target is not None:
+            while self.buffer:
+                self.target.emit(self.buffer.popleft())
+
+try:
+    import orjson  # C-extension JSON - parses tool arguments 3-5x faster
+except ImportError:
+    orjson = None
+
+
+def _parse_arguments(raw) -> dict:
+    """Parse a tool call's JSON arguments string (orjson when available)"""
+    if not raw:
+        return {}
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def wait_for_next_day(simulation_ref):
@@ -17,13 +62,11 @@ def wait_for_next_day(simulation_ref):
     """
     # Get current time from simulation
     current_time = simulation_ref.get_current_time()
-    # Calculate next day's 6:00 AM
-    next_day = current_time.date() + timedelta(days=1)
-    next_6am = datetime.combine(next_day, current_time.time().replace(hour=6, minute=0, second=0, microsecond=0))
-    next_6am = next_6am.replace(tzinfo=current_time.tzinfo)
-    
+    # Calculate next day's 6:00 AM - one add and one replace
+    next_6am = (current_time + timedelta(days=1)).replace(hour=6, minute=0, second=0, microsecond=0)
+
     # Update simulation time
-    simulation_ref.current_time = next_6am    
+    simulation_ref.current_time = next_6am
     return f"Moved day forward to {next_6am}"
 
 
@@ -139,13 +182,28 @@ TOOLS_LIST = [
     }
 ]
 
-# Tools function mapping
-TOOLS_FUNCTIONS = {
+# Prebound message templates - one .format call per string instead of
+# re-driving f-string assembly for every tool invocation
+_MSG_EXECUTED = "\n\n[Tool executed: {} - {}]".format
+_MSG_FAILED = "\n\n[Tool error: {} - Tool execution failed: {}]".format
+_MSG_UNKNOWN = "\n\n[Tool error: Unknown tool {}]".format
+_CONSOLE_OK = "🔧 Executing tool: {}\n✅ Tool result: {}".format
+_CONSOLE_FAILED = "🔧 Executing tool: {}\n❌ Tool execution failed: {}".format
+_CONSOLE_UNKNOWN = "🔧 Executing tool: {0}\n❌ Unknown tool: {0}".format
+_SUPPLIER_MSG_EXECUTED = "\n\n[Supplier tool: {} - {}]".format
+_SUPPLIER_MSG_FAILED = "\n\n[Supplier tool error: {} - {}]".format
+_SUPPLIER_MSG_UNKNOWN = "\n\n[Supplier tool error: Unknown tool {}]".format
+_SUPPLIER_CONSOLE_OK = "🔧 Executing supplier tool: {}\n✅ Tool result: {}".format
+_SUPPLIER_CONSOLE_FAILED = "🔧 Executing supplier tool: {}\n❌ Supplier tool execution failed: {}".format
+_SUPPLIER_CONSOLE_UNKNOWN = "🔧 Executing supplier tool: {0}\n❌ Unknown supplier tool: {0}".format
+
+# Tools function mapping (read-only - mutations should fail loudly)
+TOOLS_FUNCTIONS = MappingProxyType({
     "wait_for_next_day": wait_for_next_day,
     "send_email": send_email,
     "read_email": read_email,
     "check_storage_quantities": check_storage_quantities
-}
+})
 
 def execute_tool(tool_call, simulation_ref):
     """
@@ -162,44 +220,39 @@ def execute_tool(tool_call, simulation_ref):
             "console_output": str  # For printing to console
         }
     """
-    import json
-    
     function_name = tool_call.function.name
-    arguments = json.loads(tool_call.function.arguments) if tool_call.function.arguments else {}
-    
-    console_output = f"🔧 Executing tool: {function_name}"
-    print(console_output)
-    
-    # Execute the tool
-    if function_name in TOOLS_FUNCTIONS:
+    arguments = _parse_arguments(tool_call.function.arguments)
+
+    logger.info("🔧 Executing tool: %s", function_name)
+
+    # Execute the tool (single dict probe)
+    tool_fn = TOOLS_FUNCTIONS.get(function_name)
+    if tool_fn is not None:
         try:
-            tool_result = TOOLS_FUNCTIONS[function_name](simulation_ref, **arguments)
-            success_msg = f"✅ Tool result: {tool_result}"
-            print(success_msg)
-            
+            tool_result = tool_fn(simulation_ref, **arguments)
+            logger.info("✅ Tool result: %s", tool_result)
+
             return {
                 "success": True,
-                "message": f"\n\n[Tool executed: {function_name} - {tool_result}]",
-                "console_output": f"{console_output}\n{success_msg}"
+                "message": _MSG_EXECUTED(function_name, tool_result),
+                "console_output": _CONSOLE_OK(function_name, tool_result)
             }
-            
+
         except Exception as e:
-            error_msg = f"❌ Tool execution failed: {e}"
-            print(error_msg)
-            
+            logger.info("❌ Tool execution failed: %s", e)
+
             return {
                 "success": False,
-                "message": f"\n\n[Tool error: {function_name} - Tool execution failed: {e}]",
-                "console_output": f"{console_output}\n{error_msg}"
+                "message": _MSG_FAILED(function_name, e),
+                "console_output": _CONSOLE_FAILED(function_name, e)
             }
     else:
-        error_msg = f"❌ Unknown tool: {function_name}"
-        print(error_msg)
-        
+        logger.info("❌ Unknown tool: %s", function_name)
+
         return {
             "success": False,
-            "message": f"\n\n[Tool error: Unknown tool {function_name}]",
-            "console_output": f"{console_output}\n{error_msg}"
+            "message": _MSG_UNKNOWN(function_name),
+            "console_output": _CONSOLE_UNKNOWN(function_name)
         }
 
 # =============================
@@ -255,9 +308,23 @@ SUPPLIER_TOOLS = [
     }
 ]
 
-SUPPLIER_TOOLS_FUNCTIONS = {
+SUPPLIER_TOOLS_FUNCTIONS = MappingProxyType({
     "schedule_delivery": supplier_schedule_delivery,
-}
+})
+
+# Pre-serialized schema payloads, built once at import - callers that ship
+# raw JSON (logging, payload assembly) reuse these bytes instead of
+# re-dumping the static dicts per request
+if orjson is not None:
+    _TOOLS_LIST_JSON_BYTES = orjson.dumps(TOOLS_LIST)
+    _SUPPLIER_TOOLS_JSON_BYTES = orjson.dumps(SUPPLIER_TOOLS)
+else:
+    _TOOLS_LIST_JSON_BYTES = json.dumps(TOOLS_LIST, separators=(',', ':')).encode()
+    _SUPPLIER_TOOLS_JSON_BYTES = json.dumps(SUPPLIER_TOOLS, separators=(',', ':')).encode()
+
+def get_tools_schema_bytes(supplier: bool = False) -> bytes:
+    """Pre-serialized JSON for the tool schemas"""
+    return _SUPPLIER_TOOLS_JSON_BYTES if supplier else _TOOLS_LIST_JSON_BYTES
 
 def execute_supplier_tool(tool_call, simulation_ref):
     """
@@ -265,34 +332,31 @@ def execute_supplier_tool(tool_call, simulation_ref):
     Mirrors execute_tool but for supplier tools.
     """
     function_name = tool_call.function.name
-    arguments = json.loads(tool_call.function.arguments) if tool_call.function.arguments else {}
+    arguments = _parse_arguments(tool_call.function.arguments)
 
-    console_output = f"🔧 Executing supplier tool: {function_name}"
-    print(console_output)
+    logger.info("🔧 Executing supplier tool: %s", function_name)
 
-    if function_name in SUPPLIER_TOOLS_FUNCTIONS:
+    tool_fn = SUPPLIER_TOOLS_FUNCTIONS.get(function_name)
+    if tool_fn is not None:
         try:
-            tool_result = SUPPLIER_TOOLS_FUNCTIONS[function_name](simulation_ref, **arguments)
-            success_msg = f"✅ Tool result: {tool_result}"
-            print(success_msg)
+            tool_result = tool_fn(simulation_ref, **arguments)
+            logger.info("✅ Tool result: %s", tool_result)
             return {
                 "success": True,
-                "message": f"\n\n[Supplier tool: {function_name} - {tool_result}]",
-                "console_output": f"{console_output}\n{success_msg}"
+                "message": _SUPPLIER_MSG_EXECUTED(function_name, tool_result),
+                "console_output": _SUPPLIER_CONSOLE_OK(function_name, tool_result)
             }
         except Exception as e:
-            error_msg = f"❌ Supplier tool execution failed: {e}"
-            print(error_msg)
+            logger.info("❌ Supplier tool execution failed: %s", e)
             return {
                 "success": False,
-                "message": f"\n\n[Supplier tool error: {function_name} - {e}]",
-                "console_output": f"{console_output}\n{error_msg}"
+                "message": _SUPPLIER_MSG_FAILED(function_name, e),
+                "console_output": _SUPPLIER_CONSOLE_FAILED(function_name, e)
             }
     else:
-        error_msg = f"❌ Unknown supplier tool: {function_name}"
-        print(error_msg)
+        logger.info("❌ Unknown supplier tool: %s", function_name)
         return {
             "success": False,
-            "message": f"\n\n[Supplier tool error: Unknown tool {function_name}]",
-            "console_output": f"{console_output}\n{error_msg}"
+            "message": _SUPPLIER_MSG_UNKNOWN(function_name),
+            "console_output": _SUPPLIER_CONSOLE_UNKNOWN(function_name)
         }
@@ -1,10 +1,26 @@
+import numpy as np
+
+# Size codes for the SoA arrays
+_SIZE_CODE = {"small": 0, "large": 1}
+_SIZE_NAME = ("small", "large")
+
+# Fixed frame pieces for the ASCII rendering
+_FRAME_TOP = "┌─────────── VENDING MACHINE ───────────┐"
+_FRAME_PAD = "│                                       │"
+_GRID_TOP = "│  ┌─────────┬─────────┬─────────┐  │"
+_GRID_BOTTOM = "│  └─────────┴─────────┴─────────┘  │"
+_FRAME_BOTTOM = "└───────────────────────────────────────┘"
+
+
 class Item:
+    __slots__ = ('name', 'size', 'price', 'cost')
+
     def __init__(self, name, size, price, cost):
         self.name = name
         self.size = size  # 'small' or 'large'
         self.price = price  # selling price
         self.cost = cost   # cost to purchase from supplier
-    
+
     def __repr__(self):
         return f"Item({self.name}, {self.size}, ${self.price})"
 
@@ -13,121 +29,160 @@ class VendingMachine:
     def __init__(self):
         # 4 rows x 3 slots = 12 total slots
         # Rows 0-1: small items, Rows 2-3: large items
-        self.slots = {}
-        for row in range(4):
-            for slot in range(3):
-                slot_id = f"{row}-{slot}"
-                self.slots[slot_id] = {
-                    'item': None,
-                    'quantity': 0,
-                    'max_capacity': 10,  # max items per slot
-                    'size_type': 'small' if row < 2 else 'large'
-                }
-    
+        # Slot state lives in parallel arrays (structure-of-arrays) with the
+        # Item objects in a side list; "row-slot" ids map to array indices
+        self.slot_ids = [f"{row}-{slot}" for row in range(4) for slot in range(3)]
+        self._slot_index = {slot_id: i for i, slot_id in enumerate(self.slot_ids)}
+        self.qty = np.zeros(12, dtype=np.int16)
+        self.max_cap = np.full(12, 10, dtype=np.int16)  # max items per slot
+        self.size_code = np.array([0] * 6 + [1] * 6, dtype=np.int8)  # rows 0-1 small, 2-3 large
+        self._items = [None] * 12
+        # Rendering cache: re-rendered only when the state version moves
+        self._state_version = 0
+        self._render_cache = None
+        self._render_cache_version = -1
+
     def can_stock_item(self, slot_id, item):
-        """Check if item can be stocked in this slot"""
-        if slot_id not in self.slots:
-            return False
-        
-        slot = self.slots[slot_id]
-        
-        # Check size compatibility
-        if slot['size_type'] != item.size:
+        """Check if item can be stocked in this slot
+
+        Valid slot, matching size, and empty-or-same-item - one fused check.
+        """
+        idx = self._slot_index.get(slot_id)
+        if idx is None:
             return False
-        
-        # Check if slot is empty or has same item
-        if slot['item'] is None or slot['item'].name == item.name:
-            return True
-        
-        return False
-    
+
+        current = self._items[idx]
+        return (_SIZE_CODE.get(item.size) == self.size_code[idx]
+                and (current is None or current.name == item.name))
+
     def stock_item(self, slot_id, item, quantity):
         """Stock items in a specific slot"""
         if not self.can_stock_item(slot_id, item):
             return False
-        
-        slot = self.slots[slot_id]
-        
+
+        idx = self._slot_index[slot_id]
+
         # Check capacity
-        if slot['quantity'] + quantity > slot['max_capacity']:
+        if self.qty[idx] + quantity > self.max_cap[idx]:
             return False
-        
+
         # Stock the item
-        slot['item'] = item
-        slot['quantity'] += quantity
+        self._items[idx] = item
+        self.qty[idx] += quantity
+        self._state_version += 1
         return True
-    
+
     def get_slots(self):
-        """Get current inventory state"""
-        return self.slots
-    
+        """Get current inventory state as {slot_id: slot_dict} (built on demand)"""
+        return {
+            slot_id: {
+                'item': self._items[i],
+                'quantity': int(self.qty[i]),
+                'max_capacity': int(self.max_cap[i]),
+                'size_type': _SIZE_NAME[self.size_code[i]]
+            }
+            for i, slot_id in enumerate(self.slot_ids)
+        }
+
     def get_available_slots(self, size_type):
         """Get available slots for a specific size type"""
-        available = []
-        for slot_id, slot in self.slots.items():
-            if slot['size_type'] == size_type and (slot['item'] is None or slot['quantity'] < slot['max_capacity']):
-                available.append(slot_id)
-        return available
-    
+        code = _SIZE_CODE.get(size_type, -1)
+        empty = np.array([item is None for item in self._items])
+        available = np.flatnonzero((self.size_code == code) & (empty | (self.qty < self.max_cap)))
+        return [self.slot_ids[i] for i in available]
+
     def sell_item(self, slot_id, quantity=1):
-        """Sell items from the specified slot"""
-        if slot_id not in self.slots:
-            return None
-        
-        slot = self.slots[slot_id]
-        if slot['quantity'] <= 0 or slot['item'] is None:
-            return None
-        
+        """Sell items from the specified slot
+
+        Returns:
+            (item_or_none, actual_quantity, slot_now_empty) - one shape for
+            every outcome, so callers don't branch on the return type.
+            Invalid or empty slots sell (None, 0, False/True).
+        """
+        idx = self._slot_index.get(slot_id)
+        if idx is None:
+            return None, 0, False
+
+        item = self._items[idx]
+        if item is None or self.qty[idx] <= 0:
+            return None, 0, item is None
+
         # Can't sell more than available
-        actual_quantity = min(quantity, slot['quantity'])
-        
+        actual_quantity = min(quantity, int(self.qty[idx]))
+
         # Remove items
-        slot['quantity'] -= actual_quantity
-        
-        # If slot is empty, clear the item
-        if slot['quantity'] == 0:
-            item = slot['item']
-            slot['item'] = None
-            return item, actual_quantity
-        
-        return slot['item'], actual_quantity
-    
-    def print_machine(self):
-        """Print ASCII diagram of the vending machine"""
-        print("┌─────────── VENDING MACHINE ───────────┐")
-        print("│                                       │")
-        
+        self.qty[idx] -= actual_quantity
+        self._state_version += 1
+
+        # If slot is empty, clear the item (plain bool - the qty comparison
+        # yields numpy.bool_, which would break `is` checks and JSON dumps)
+        now_empty = bool(self.qty[idx] == 0)
+        if now_empty:
+            self._items[idx] = None
+
+        return item, actual_quantity, now_empty
+
+    def sell_items(self, updates):
+        """Sell from multiple slots in one pass
+
+        Args:
+            updates: dict of slot_id -> quantity to sell
+
+        Returns:
+            dict of slot_id -> (item_or_none, actual_quantity, slot_now_empty)
+        """
+        return {slot_id: self.sell_item(slot_id, quantity)
+                for slot_id, quantity in updates.items()}
+
+    def render_machine(self) -> str:
+        """Build the ASCII diagram of the vending machine as one string
+
+        The rendered frame is cached and reused until a stock/sell mutation
+        bumps the state version.
+        """
+        if self._render_cache_version == self._state_version:
+            return self._render_cache
+
+        lines = [_FRAME_TOP, _FRAME_PAD]
+
         for row in range(4):
             size_label = "SMALL ITEMS" if row < 2 else "LARGE ITEMS"
             if row == 0 or row == 2:
-                print(f"│  {size_label:^33}  │")
-                print("│  ┌─────────┬─────────┬─────────┐  │")
-            
-            # Print slot contents
+                lines.append(f"│  {size_label:^33}  │")
+                lines.append(_GRID_TOP)
+
+            # Slot contents
             row_display = "│  │"
             for slot in range(3):
-                slot_id = f"{row}-{slot}"
-                slot_data = self.slots[slot_id]
-                
-                if slot_data['item'] is None:
+                idx = row * 3 + slot
+                item = self._items[idx]
+
+                if item is None:
                     content = "EMPTY"
-                    qty = ""
                 else:
                     # Truncate item name to fit
-                    name = slot_data['item'].name[:7]
-                    qty = f"({slot_data['quantity']})"
+                    name = item.name[:7]
+                    qty = f"({int(self.qty[idx])})"
                     content = f"{name} {qty}"
-                
+
                 # Center content in 9-char width
                 row_display += f"{content:^9}│"
-            
+
             row_display += "  │"
-            print(row_display)
-            
+            lines.append(row_display)
+
             if row == 1 or row == 3:
-                print("│  └─────────┴─────────┴─────────┘  │")
+                lines.append(_GRID_BOTTOM)
                 if row == 1:
-                    print("│                                       │")
-        
-        print("│                                       │")
-        print("└───────────────────────────────────────┘")
\ No newline at end of file
+                    lines.append(_FRAME_PAD)
+
+        lines.append(_FRAME_PAD)
+        lines.append(_FRAME_BOTTOM)
+
+        self._render_cache = "\n".join(lines)
+        self._render_cache_version = self._state_version
+        return self._render_cache
+
+    def print_machine(self):
+        """Print ASCII diagram of the vending machine (single write)"""
+        print(self.render_machine())
@@ -1,16 +1,20 @@
 import random
+import numpy as np
+from bisect import bisect
 from typing import Dict
 
+try:
+    from numba import njit  # optional - kernels run as plain Python without it
+except ImportError:
+    njit = None
+
+# Season by month number (index 0 pads for 1-based months)
+_SEASON_BY_MONTH = (None, "winter", "winter", "spring", "spring", "spring",
+                    "summer", "summer", "summer", "fall", "fall", "fall", "winter")
+
 def get_season_from_month(month: int) -> str:
     """Get season from month number (1-12)"""
-    if month in [12, 1, 2]:
-        return "winter"
-    elif month in [3, 4, 5]:
-        return "spring"
-    elif month in [6, 7, 8]:
-        return "summer"
-    else:  # 9, 10, 11
-        return "fall"
+    return _SEASON_BY_MONTH[month]
 
 def get_weather_probabilities(season: str, previous_weather: str) -> Dict[str, float]:
     """
@@ -54,41 +58,115 @@ def get_weather_probabilities(season: str, previous_weather: str) -> Dict[str, f
     
     return probabilities
 
+# There are only 4 seasons x 4 previous-weather states and the transition
+# probabilities are deterministic, so precompute every (season, prev) CDF
+# once at import instead of rebuilding/normalizing dicts per day
+def _build_weather_cdf():
+    from itertools import accumulate
+    table = {}
+    for season in ("winter", "spring", "summer", "fall"):
+        for prev in ("sunny", "rainy", "cloudy", "snowy"):
+            probabilities = get_weather_probabilities(season, prev)
+            states = tuple(probabilities.keys())
+            cum_weights = list(accumulate(probabilities.values()))
+            table[(season, prev)] = (states, cum_weights)
+    return table
+
+_WEATHER_CDF = _build_weather_cdf()
+
+# Integer-coded view of the same table for batch simulation: seasons and
+# states get fixed codes and the CDFs live in one float32 array
+_SEASON_ORDER = ("winter", "spring", "summer", "fall")
+_STATE_ORDER = ("sunny", "cloudy", "rainy", "snowy")
+_SEASON_CODE = {season: i for i, season in enumerate(_SEASON_ORDER)}
+_STATE_CODE = {state: i for i, state in enumerate(_STATE_ORDER)}
+
+def _build_cdf_array():
+    table = np.empty((4, 4, 4), dtype=np.float32)
+    for season_i, season in enumerate(_SEASON_ORDER):
+        for prev_i, prev in enumerate(_STATE_ORDER):
+            probabilities = get_weather_probabilities(season, prev)
+            cum = 0.0
+            for state_i, state in enumerate(_STATE_ORDER):
+                cum += probabilities[state]
+                table[season_i, prev_i, state_i] = cum
+    return table
+
+_CDF_ARRAY = _build_cdf_array()
+
+def _next_weather_code(season_i: int, prev_i: int, cdf_table, u: float) -> int:
+    """Markov step on integer codes (JIT-compiled when numba is present)"""
+    row = cdf_table[season_i, prev_i]
+    for k in range(3):
+        if u < row[k]:
+            return k
+    return 3
+
+if njit is not None:
+    _next_weather_code = njit(cache=True)(_next_weather_code)
+
 def generate_next_weather(month: int, previous_weather: str = "sunny") -> str:
     """
     Generate next day's weather based on month and previous weather
-    
+
     Args:
         month: Month number (1-12)
         previous_weather: Previous day's weather state
-    
+
     Returns:
         Next day's weather state as string
     """
     season = get_season_from_month(month)
-    probabilities = get_weather_probabilities(season, previous_weather)
-    
-    # Random selection based on probabilities
-    weather_states = list(probabilities.keys())
-    weights = list(probabilities.values())
-    
-    return random.choices(weather_states, weights=weights)[0]
+    states, cum_weights = _WEATHER_CDF[(season, previous_weather)]
+
+    # Direct bisect over the 4-entry CDF - skips random.choices' per-call
+    # wrapper and single-element list allocation
+    return states[bisect(cum_weights, random.random() * cum_weights[-1])]
+
+# Sales multipliers by weather state, built once at import
+_WEATHER_MULT = {
+    "sunny": 1.10,    # +10% - people are out and about
+    "rainy": 0.85,    # -15% - people stay indoors more
+    "cloudy": 1.00,   # neutral baseline
+    "snowy": 0.75     # -25% - severe weather reduces foot traffic
+}
+
+def generate_weather_series(months, previous_weather: str = "sunny"):
+    """
+    Generate one weather state per day for a whole horizon in one pass
+
+    Args:
+        months: sequence of month numbers (1-12), one per simulated day
+        previous_weather: weather state preceding the first day
+
+    Returns:
+        List of weather state strings, one per entry in months
+    """
+    n_days = len(months)
+    if n_days == 0:
+        return []
+
+    # One RNG call for the whole horizon; the Markov walk indexes the
+    # precomputed CDF array (numba-compiled kernel when available)
+    u = np.random.random(n_days)
+    season_codes = [_SEASON_CODE[get_season_from_month(month)] for month in months]
+
+    out = []
+    prev = _STATE_CODE[previous_weather]
+    for i in range(n_days):
+        prev = _next_weather_code(season_codes[i], prev, _CDF_ARRAY, u[i])
+        out.append(_STATE_ORDER[prev])
+
+    return out
 
 def get_weather_sales_multiplier(weather: str) -> float:
     """
     Get overall sales multiplier based on weather
-    
+
     Args:
         weather: Current weather state
-    
+
     Returns:
         Float multiplier for overall sales (1.0 = no change)
     """
-    multipliers = {
-        "sunny": 1.10,    # +10% - people are out and about
-        "rainy": 0.85,    # -15% - people stay indoors more
-        "cloudy": 1.00,   # neutral baseline
-        "snowy": 0.75     # -25% - severe weather reduces foot traffic
-    }
-    
-    return multipliers.get(weather, 1.00)
\ No newline at end of file
+    return _WEATHER_MULT.get(weather, 1.00)
\ No newline at end of file